@@ -0,0 +1,100 @@
+"""Compare the installed text-extraction backends on a fixed corpus of sample CVs
+
+    python benchmark_extractors.py [--rounds N] [files ...]
+
+For each backend it reports throughput, its speedup over the PyPDF2/python-docx fallback, and two
+measures of text fidelity that need no hand-made transcripts: agreement, the mean similarity of
+its word sequence to every other backend's, and skills, the share of the technical skills found
+by any backend in a document that it finds too. Gluing words together or dropping text lowers
+both. The corpus defaults to the PDF and DOCX files in attached_assets.
+"""
+import argparse
+import glob
+import os
+import time
+from difflib import SequenceMatcher
+
+from nlp_matcher import NLPMatcher
+from text_extractors import EXTRACTORS, FALLBACK_EXTRACTORS
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'attached_assets')
+
+
+def load_corpus(paths):
+    """{format: [(file name, content)]} of the PDF and DOCX files among paths"""
+    corpus = {'pdf': [], 'docx': []}
+    for path in sorted(paths):
+        file_format = os.path.splitext(path)[1].lower().lstrip('.')
+        if file_format in corpus:
+            with open(path, 'rb') as document_file:
+                corpus[file_format].append((os.path.basename(path), document_file.read()))
+    return corpus
+
+
+def time_extractor(extractor, documents, rounds):
+    """(texts, seconds per round) of extracting every document rounds times"""
+    texts = [extractor.extract(content) for _, content in documents]  # warm up imports and caches
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _, content in documents:
+            extractor.extract(content)
+    return texts, (time.perf_counter() - start) / rounds
+
+
+def word_similarity(text, other_text):
+    """Similarity of two texts' word sequences, from 0 to 1"""
+    return SequenceMatcher(None, text.split(), other_text.split(), autojunk=False).ratio()
+
+
+def run_benchmark(paths, rounds):
+    corpus = load_corpus(paths)
+    matcher = NLPMatcher()
+    for file_format, documents in corpus.items():
+        if not documents:
+            continue
+        total_bytes = sum(len(content) for _, content in documents)
+        print(f"\n{file_format.upper()}: {len(documents)} documents, {total_bytes / 1024:.0f} KB, {rounds} rounds")
+        print(f"{'backend':<12} {'docs/s':>8} {'MB/s':>8} {'speedup':>8} {'words':>8} {'agreement':>10} {'skills':>8}")
+
+        results = {}
+        for extractor in EXTRACTORS[file_format]:
+            if not extractor.available():
+                print(f"{extractor.name:<12} not installed")
+                continue
+            try:
+                results[extractor.name] = time_extractor(extractor, documents, rounds)
+            except Exception as e:
+                print(f"{extractor.name:<12} failed: {str(e)}")
+
+        if not results:
+            print("No backend could extract these documents")
+            continue
+        fallback_name = FALLBACK_EXTRACTORS[file_format].name
+        fallback_seconds = results[fallback_name][1] if fallback_name in results else None
+
+        # Skills found in each document by any backend
+        skills = {name: [set(matcher.extract_technical_skills(text)) for text in texts]
+                  for name, (texts, _) in results.items()}
+        all_skills = [set().union(*found) for found in zip(*skills.values())]
+
+        for name, (texts, seconds) in results.items():
+            others = [other_texts for other, (other_texts, _) in results.items() if other != name]
+            agreement = [word_similarity(text, other_texts[i]) for i, text in enumerate(texts)
+                         for other_texts in others]
+            recall = [len(found) / len(expected) for found, expected in zip(skills[name], all_skills) if expected]
+            words = sum(len(text.split()) for text in texts)
+            print(f"{name:<12} {len(documents) / seconds:>8.1f} {total_bytes / seconds / 1024 / 1024:>8.2f} "
+                  f"{f'{fallback_seconds / seconds:.1f}x' if fallback_seconds else '-':>8} {words:>8} "
+                  f"{sum(agreement) / len(agreement) if agreement else 1.0:>10.3f} "
+                  f"{sum(recall) / len(recall) if recall else 1.0:>8.0%}")
+
+        fastest = min(results, key=lambda name: results[name][1])
+        print(f"Fastest: {fastest} (select it with {file_format.upper()}_EXTRACTOR={fastest})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the installed PDF/DOCX text extractors")
+    parser.add_argument('files', nargs='*', help="Documents to extract (default: the samples in attached_assets)")
+    parser.add_argument('--rounds', type=int, default=20, help="Times each document is extracted per backend")
+    args = parser.parse_args()
+    run_benchmark(args.files or glob.glob(os.path.join(CORPUS_DIR, '*')), args.rounds)
@@ -0,0 +1,51 @@
+from functools import cached_property
+
+
+class CVDocument:
+    """A CV's text normalized and segmented once, shared by every consumer
+
+    Each view (lowered text, lines, tokens) is computed the first time it is used and cached on
+    the document. Pickling keeps only the text, so a document sent to another process stays small.
+    """
+
+    def __init__(self, text):
+        self.text = text if isinstance(text, str) else str(text or '')
+
+    @classmethod
+    def from_text(cls, text):
+        """Return text itself if it is already a CVDocument, otherwise wrap it"""
+        if isinstance(text, cls):
+            return text
+        return cls(text)
+
+    def __getstate__(self):
+        return {'text': self.text}
+
+    def __str__(self):
+        return self.text
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __len__(self):
+        return len(self.text)
+
+    @cached_property
+    def lower(self):
+        """The whole text lowercased"""
+        return self.text.lower()
+
+    @cached_property
+    def lines(self):
+        """Lines of the lowercased text, unstripped"""
+        return self.lower.split('\n')
+
+    @cached_property
+    def tokens(self):
+        """Whitespace-separated tokens of the lowercased text"""
+        return self.lower.split()
+
+    @cached_property
+    def token_set(self):
+        """Distinct tokens of the lowercased text"""
+        return frozenset(self.tokens)
@@ -1,24 +1,257 @@
+import heapq
+import os
+import time
+from itertools import count
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import streamlit as st
+from cv_document import CVDocument
+
+# Scoring engine of an evaluation worker process, built once by _init_evaluation_worker
+_worker_engine = None
+
+# CVs whose skills are extracted and matched together when evaluating without a pool; results
+# are yielded after each chunk
+SEQUENTIAL_CHUNK_SIZE = 32
+
+
+def _init_evaluation_worker():
+    global _worker_engine
+    from scoring_engine import ScoringEngine
+    _worker_engine = ScoringEngine()
+
+
+def _evaluate_chunk(engine, job_requirements, cvs):
+    """Extract skills from, match and evaluate a chunk of CVs; engine is None inside a worker process"""
+    engine = engine or _worker_engine
+    # Each CV is normalized once and shared by extraction and every scoring stage
+    documents = [CVDocument.from_text(cv.get('cv_text', '')) for cv in cvs]
+    technical_skills = [engine.nlp_matcher.extract_technical_skills(document) for document in documents]
+    # Skill matching and coverage for the whole chunk at once
+    skills_matches = engine.score_skills_batch(technical_skills, job_requirements, documents)
+    return [engine.evaluate_cv({**cv, 'cv_text': document}, job_requirements, technical_skills=skills,
+                               skills_match=skills_match)
+            for cv, document, skills, skills_match in zip(cvs, documents, technical_skills, skills_matches)]
+
+
+def _overall_score(item):
+    """Overall score of a result, or of an (index, result) pair from iter_cv_batch"""
+    return (item[1] if isinstance(item, tuple) else item)['overall_score']
+
+
+class TopCandidates:
+    """Running top-K of results by overall score, kept in a bounded heap while a batch streams in
+
+    Ties keep the earlier result, as a stable sort would.
+    """
+
+    def __init__(self, limit=10):
+        self.limit = limit
+        self._heap = []  # (score, -arrival, item), lowest score and latest arrival first
+        self._arrival = count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, item):
+        """Offer a result (or (index, result) pair); returns it back for use in a pipeline"""
+        if self.limit > 0:
+            entry = (_overall_score(item), -next(self._arrival), item)
+            if len(self._heap) < self.limit:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+        return item
+
+    def candidates(self):
+        """Current top results, best first"""
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
 class CVEvaluator:
     def __init__(self, scoring_engine):
         self.scoring_engine = scoring_engine
 
-    def process_cv_batch(self, cv_data, job_requirements):
-        """Process a batch of CVs against job requirements"""
-        results = []
-        for cv in cv_data:
-            result = self.scoring_engine.evaluate_cv(cv, job_requirements)
-            results.append(result)
+    def process_cv_batch(self, cv_data, job_requirements, workers=1, executor=None, timeout=None, chunksize=None):
+        """Process a batch of CVs against job requirements
+
+        With more than one worker (or None for one per core) the CVs are evaluated in parallel;
+        see iter_cv_batch.
+        """
+        cv_data = list(cv_data)
+        results = [None] * len(cv_data)
+        for index, result in self.iter_cv_batch(cv_data, job_requirements, workers, executor, timeout, chunksize):
+            results[index] = result
         return results
 
+    def iter_cv_batch(self, cv_data, job_requirements, workers=1, executor=None, timeout=None, chunksize=None,
+                      ordered=False):
+        """Evaluate a batch of CVs, yielding (index, result) pairs as soon as each CV is evaluated
+
+        executor is 'thread' (for the network-bound AI analysis, the default when it is enabled)
+        or 'process' (for CPU-bound scoring). CVs are sent to the executor in chunks, with at most
+        one chunk per worker in flight; each chunk's skills are extracted and matched together as
+        part of its evaluation, so results stream out from the first chunk on. A CV that raises,
+        or is not evaluated within timeout seconds of its chunk being started, gets an empty
+        result instead of failing the batch. With ordered=True results are yielded in input order.
+        """
+        cv_data = list(cv_data)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(cv_data))
+        if not cv_data:
+            return
+        if workers <= 1:
+            if timeout is None:
+                chunksize = chunksize or SEQUENTIAL_CHUNK_SIZE
+                for start in range(0, len(cv_data), chunksize):
+                    chunk = cv_data[start:start + chunksize]
+                    yield from enumerate(self._evaluate_sequential(job_requirements, chunk), start)
+                return
+            # A CV can only be given up on in another thread, so a time limit needs a single-worker pool
+            workers = 1
+            executor = executor or 'thread'
+
+        results = self._iter_parallel(cv_data, job_requirements, workers, executor, timeout, chunksize)
+        if not ordered:
+            yield from results
+            return
+
+        # Hold back results that complete ahead of an earlier CV
+        pending = {}
+        next_index = 0
+        for index, result in results:
+            pending[index] = result
+            while next_index in pending:
+                yield next_index, pending.pop(next_index)
+                next_index += 1
+
+    def _evaluate_sequential(self, job_requirements, cvs):
+        """Evaluate a chunk of CVs in this thread, giving every CV an error result if it raises"""
+        try:
+            return _evaluate_chunk(self.scoring_engine, job_requirements, cvs)
+        except Exception as e:
+            return [self.scoring_engine._create_empty_result(f"Error during evaluation: {str(e)}") for _ in cvs]
+
+    def _iter_parallel(self, cvs, job_requirements, workers, executor, timeout, chunksize):
+        """Evaluate CVs across an executor, yielding (index, result) pairs in completion order"""
+        if executor is None:
+            executor = 'thread' if self.scoring_engine.use_ai else 'process'
+        if chunksize is None:
+            # Threads wait on the network, so single CVs keep them busy; processes amortize IPC
+            chunksize = 1 if executor == 'thread' else max(1, len(cvs) // (workers * 4))
+        chunks = [list(range(start, min(start + chunksize, len(cvs))))
+                  for start in range(0, len(cvs), chunksize)]
+
+        if executor == 'process':
+            def new_pool():
+                return ProcessPoolExecutor(max_workers=workers, initializer=_init_evaluation_worker)
+            # Worker processes build their own engine; CVs are sent as plain text
+            engine = None
+            cvs = [{**cv, 'cv_text': CVDocument.from_text(cv.get('cv_text', '')).text} for cv in cvs]
+        else:
+            def new_pool():
+                return ThreadPoolExecutor(max_workers=workers)
+            engine = self.scoring_engine
+        pool = new_pool()
+
+        try:
+            in_flight = {}  # future -> (chunk indices, deadline once the chunk has started)
+            abandoned = set()  # timed-out chunks still occupying a worker
+            pool_failed = False
+            remaining = iter(chunks)
+            exhausted = False
+            while True:
+                if not exhausted and len(abandoned) >= workers:
+                    # Every worker is stuck on a timed-out chunk (e.g. a request that never returns):
+                    # leave them to finish in the background and go on with a fresh pool
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = new_pool()
+                    abandoned.clear()
+
+                # Keep at most one chunk per worker in flight, counting workers still busy with
+                # abandoned chunks, so every submitted chunk starts at once and slow CVs hold back submission
+                while not exhausted and len(in_flight) + len(abandoned) < workers:
+                    chunk = next(remaining, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    chunk_cvs = [cvs[i] for i in chunk]
+                    try:
+                        future = pool.submit(_evaluate_chunk, engine, job_requirements, chunk_cvs)
+                    except Exception as e:
+                        # The pool is unusable (e.g. a worker process died); finish in this process
+                        if not pool_failed:
+                            st.warning(f"Parallel CV evaluation failed, evaluating sequentially: {str(e)}")
+                            pool_failed = True
+                        yield from zip(chunk, self._evaluate_sequential(job_requirements, chunk_cvs))
+                        continue
+                    in_flight[future] = (chunk, None)
+                if not in_flight and (exhausted or not abandoned):
+                    break
+
+                # A chunk's time limit runs from when a worker starts it, not from when it was queued
+                waiting_to_start = False
+                if timeout is not None:
+                    now = time.monotonic()
+                    for future, (chunk, deadline) in in_flight.items():
+                        if deadline is None:
+                            if future.running() or future.done():
+                                in_flight[future] = (chunk, now + timeout * len(chunk))
+                            else:
+                                waiting_to_start = True
+
+                deadlines = [deadline for _, deadline in in_flight.values() if deadline is not None]
+                wait_time = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+                if waiting_to_start:
+                    # Poll briefly to notice when the queued chunks start
+                    wait_time = min(wait_time, 0.05) if wait_time is not None else 0.05
+                done, _ = wait(set(in_flight) | abandoned, timeout=wait_time, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    if future in abandoned:
+                        # Its worker is free again; the result was already reported as timed out
+                        abandoned.discard(future)
+                        continue
+                    chunk, _ = in_flight.pop(future)
+                    try:
+                        chunk_results = future.result()
+                    except Exception as e:
+                        chunk_results = [self.scoring_engine._create_empty_result(f"Error during evaluation: {str(e)}")
+                                         for _ in chunk]
+                    yield from zip(chunk, chunk_results)
+
+                # Abandon chunks past their deadline; their workers finish in the background and
+                # count against the worker limit until they do, or until every worker is abandoned
+                now = time.monotonic()
+                for future, (chunk, deadline) in list(in_flight.items()):
+                    if deadline is not None and now >= deadline and not future.done():
+                        del in_flight[future]
+                        if not future.cancel():
+                            abandoned.add(future)
+                        for index in chunk:
+                            yield index, self.scoring_engine._create_empty_result(
+                                f"Evaluation timed out after {timeout} seconds")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def shortlist_candidates(self, cv_data, job_requirements, limit=100):
+        """Narrow a batch of CVs to the best BM25 matches for the job, before full scoring"""
+        cv_data = list(cv_data)
+        nlp_matcher = self.scoring_engine.nlp_matcher
+        corpus = nlp_matcher.create_corpus([str(CVDocument.from_text(cv.get('cv_text', ''))) for cv in cv_data])
+        ranked = nlp_matcher.rank_cvs_bm25(job_requirements, corpus, limit)
+        return [cv_data[doc_id] for doc_id, _ in ranked]
+
     def filter_suitable_candidates(self, results, threshold=60):
-        """Filter candidates above the suitability threshold"""
-        return [r for r in results if r['overall_score'] >= threshold]
+        """Lazily filter candidates above the suitability threshold
+
+        results may be any iterable of results or (index, result) pairs, e.g. iter_cv_batch.
+        """
+        return (r for r in results if _overall_score(r) >= threshold)
 
     def get_top_candidates(self, results, limit=10):
-        """Get top N candidates by overall score"""
-        sorted_results = sorted(
-            results,
-            key=lambda x: x['overall_score'],
-            reverse=True
-        )
-        return sorted_results[:limit]
+        """Get top N candidates by overall score, holding only N results at a time
+
+        results may be any iterable of results or (index, result) pairs; ties keep input order.
+        """
+        return heapq.nlargest(limit, results, key=_overall_score)
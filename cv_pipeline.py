@@ -0,0 +1,227 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import streamlit as st
+from cv_document import CVDocument
+from utils import (MAX_DOCUMENT_BYTES, UNSUPPORTED_MIME_PREFIXES, calculate_years_experience, fetch_document,
+                   parse_document_content, prefetch_drive_metadata)
+
+# Skill matcher of a parse worker process, built once by _init_parse_worker
+_worker_matcher = None
+
+
+def _init_parse_worker():
+    global _worker_matcher
+    from nlp_matcher import NLPMatcher
+    _worker_matcher = NLPMatcher()
+
+
+def _fetch(cv_url, metadata=None, max_bytes=MAX_DOCUMENT_BYTES):
+    """Download stage: (content, error) for a CV link"""
+    if not cv_url or not cv_url.strip():
+        return None, "No CV URL provided"
+    try:
+        return fetch_document(cv_url, metadata, max_bytes)
+    except Exception as e:
+        return None, f"Error processing document: {str(e)}"
+
+
+def _needs_download(metadata, max_bytes):
+    """False when a CV's prefetched Drive metadata already rules it out"""
+    if metadata is None:
+        return True
+    if isinstance(metadata, Exception):
+        return False
+    if max_bytes and int(metadata.get('size', 0)) > max_bytes:
+        return False
+    return not metadata.get('mimeType', '').startswith(UNSUPPORTED_MIME_PREFIXES)
+
+
+def _error_result(message):
+    """Pipeline result of a CV that could not be processed"""
+    return 0, None, message, None, None, None
+
+
+def _parse(cv_url, start_date_str, fetched, extract_skills, matcher=None):
+    """Parse stage: (years_exp, first_line, cv_content, technical_skills, document, fetch_error) for
+    a downloaded CV
+
+    The first three values are what calculate_years_experience returns for the link;
+    technical_skills is None unless skills were extracted from the CV text, and document is the
+    CVDocument of cv_content, built once and shared by every stage that reads the text.
+    fetch_error is the download's error message when the document could not be fetched, which a
+    later run may succeed at, else None. Any other error becomes the CV's error message, so one
+    bad document never stops the run.
+    """
+    try:
+        return _parse_cv(cv_url, start_date_str, fetched, extract_skills, matcher)
+    except Exception as e:
+        return _error_result(f"Error processing CV: {str(e)}")
+
+
+def _parse_cv(cv_url, start_date_str, fetched, extract_skills, matcher):
+    content, error = fetched
+    if content is None:
+        parsed = (None, None, error)
+    else:
+        try:
+            parsed = parse_document_content(content)
+        except Exception as e:
+            parsed = (None, None, f"Error processing document: {str(e)}")
+
+    document = CVDocument(parsed[2]) if isinstance(parsed[2], str) else None
+    years_exp, first_line, cv_content = calculate_years_experience(
+        cv_url=cv_url, start_date_str=start_date_str, parsed=parsed, document=document)
+    if not isinstance(cv_content, str):
+        document = None
+    elif document is None or document.text is not cv_content:
+        document = CVDocument(cv_content)
+
+    technical_skills = None
+    if extract_skills and document is not None and cv_content.strip():
+        technical_skills = (matcher or _worker_matcher).extract_technical_skills(document)
+    return years_exp, first_line, cv_content, technical_skills, document, error if content is None else None
+
+
+class _PipelineItem:
+    __slots__ = ('cv_url', 'start_date_str', 'fetched', 'future', 'parsing', 'retried')
+
+    def __init__(self, cv_url, start_date_str, future):
+        self.cv_url = cv_url
+        self.start_date_str = start_date_str
+        self.fetched = None
+        self.future = future  # the download, then the parse
+        self.parsing = False
+        self.retried = False  # whether the parse has been retried after its worker died
+
+
+class CVPipeline:
+    """Staged CV processing: a thread pool downloads documents while a process pool parses them
+    and extracts skills, and results are collected in input order
+
+    At most max_pending CVs are between download and collection at any time, so downloads pause
+    while parsing (or the caller) falls behind and memory stays flat however long the sheet is.
+    With prefetch_metadata, the Drive metadata of every CV is looked up in batches before the
+    first download; CVs it rules out (missing, unshared or unsupported files) then resolve
+    without taking a download slot, and the rest download without a metadata request of their own.
+    Documents larger than max_document_bytes are never downloaded in full. When a parse worker
+    dies (a segfault or running out of memory in a parser), the pool is replaced and each CV it
+    held is retried once, alone in a fresh worker; a CV that fails again is reported as an error.
+    CVs are never parsed in this process as a fallback.
+    """
+
+    def __init__(self, download_workers=8, parse_workers=None, max_pending=None, nlp_matcher=None,
+                 prefetch_metadata=True, max_document_bytes=MAX_DOCUMENT_BYTES):
+        self.download_workers = download_workers
+        self.parse_workers = parse_workers if parse_workers is not None else (os.cpu_count() or 1)
+        self.max_pending = max_pending or 2 * (self.download_workers + self.parse_workers)
+        # Extracts skills in this process when there is no parse pool
+        self.nlp_matcher = nlp_matcher
+        self.prefetch_metadata = prefetch_metadata
+        self.max_document_bytes = max_document_bytes
+
+    def _matcher(self):
+        if self.nlp_matcher is None:
+            from nlp_matcher import NLPMatcher
+            self.nlp_matcher = NLPMatcher()
+        return self.nlp_matcher
+
+    def _new_parse_pool(self, workers=None):
+        return ProcessPoolExecutor(max_workers=workers or self.parse_workers, initializer=_init_parse_worker)
+
+    @staticmethod
+    def _submit_parse(pool, item, extract_skills):
+        """item's parse in pool, as a future that fails rather than raising if the pool is unusable"""
+        try:
+            return pool.submit(_parse, item.cv_url, item.start_date_str, item.fetched, extract_skills)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+            return future
+
+    def _parse_inline(self, item, extract_skills):
+        future = Future()
+        future.set_result(_parse(item.cv_url, item.start_date_str, item.fetched, extract_skills,
+                                 self._matcher() if extract_skills else None))
+        return future
+
+    def run(self, items, extract_skills=True):
+        """Process (cv_url, start_date_str) items, yielding (years_exp, first_line, cv_content,
+        technical_skills, document, fetch_error) for each in input order"""
+        drive_metadata = {}
+        if self.prefetch_metadata:
+            items = list(items)
+            drive_metadata = prefetch_drive_metadata(cv_url for cv_url, _ in items)
+        items = iter(items)
+        window = deque()
+        download_pool = ThreadPoolExecutor(max_workers=self.download_workers)
+        parse_pool = self._new_parse_pool() if self.parse_workers > 1 else None
+        retry_pool = None  # the fresh single worker retrying the oldest CV
+
+        try:
+            exhausted = False
+            while True:
+                # Backpressure: only start new downloads while the window has room
+                while not exhausted and len(window) < self.max_pending:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    cv_url, start_date_str = item
+                    metadata = drive_metadata.get(cv_url)
+                    if _needs_download(metadata, self.max_document_bytes):
+                        future = download_pool.submit(_fetch, cv_url, metadata, self.max_document_bytes)
+                    else:
+                        future = Future()
+                        future.set_result(_fetch(cv_url, metadata, self.max_document_bytes))
+                    window.append(_PipelineItem(cv_url, start_date_str, future))
+                if not window:
+                    break
+
+                # Hand finished downloads to the parse stage
+                for item in window:
+                    if not item.parsing and item.future.done():
+                        item.fetched = item.future.result()
+                        item.parsing = True
+                        if parse_pool is None:
+                            item.future = self._parse_inline(item, extract_skills)
+                            continue
+                        item.future = self._submit_parse(parse_pool, item, extract_skills)
+                        if item.future.done() and isinstance(item.future.exception(), BrokenProcessPool):
+                            # A worker died since the last submit; the CVs it held are retried as they are collected
+                            parse_pool.shutdown(wait=False, cancel_futures=True)
+                            parse_pool = self._new_parse_pool()
+                            item.future = self._submit_parse(parse_pool, item, extract_skills)
+
+                # Ordered collector: yield the oldest CV once it is parsed
+                head = window[0]
+                if head.parsing and head.future.done():
+                    try:
+                        result = head.future.result()
+                    except Exception as e:
+                        if not head.retried:
+                            # Its worker died, on this CV or on another one sharing the pool: retry it
+                            # alone, so a CV that kills workers cannot take other CVs down with it
+                            head.retried = True
+                            retry_pool = self._new_parse_pool(1)
+                            head.future = self._submit_parse(retry_pool, head, extract_skills)
+                            continue
+                        st.warning(f"Parsing the CV at {head.cv_url} failed twice: {str(e)}")
+                        result = _error_result(f"Error processing CV: the parser failed ({str(e)})")
+                    if head.retried:
+                        retry_pool.shutdown(wait=False, cancel_futures=True)
+                        retry_pool = None
+                    window.popleft()
+                    yield result
+                    continue
+
+                running = [item.future for item in window if not item.future.done()]
+                if running:
+                    wait(running, return_when=FIRST_COMPLETED)
+        finally:
+            download_pool.shutdown(wait=False, cancel_futures=True)
+            for pool in (parse_pool, retry_pool):
+                if pool is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
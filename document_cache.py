@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+DOCUMENT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.document_cache')
+
+# Total size of cached documents before the least recently used ones are evicted
+DOCUMENT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Eviction frees space down to this share of the limit, so it runs rarely rather than on every put
+EVICTION_TARGET = 0.9
+
+# Puts between rescans of the cache directory, to notice documents other processes have added
+RESCAN_INTERVAL = 256
+
+
+def _write_atomic(path, data):
+    """Write data to path through a temporary file so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class DocumentCache:
+    """Content-addressed on-disk cache of downloaded CV documents
+
+    Documents are stored once per SHA-256 of their content under objects/. A key (a Drive file
+    id with its md5Checksum or modifiedTime, or a URL) maps to a document and metadata such as
+    the response ETag under keys/. All files are written atomically, so several threads or
+    processes can share one cache directory. Reads refresh a document's mtime, and once the
+    documents exceed max_bytes the least recently used ones are evicted together with the keys
+    pointing to them. The total size is tracked in memory, so the directory is only scanned when
+    the cache may be full and every RESCAN_INTERVAL puts.
+    """
+
+    def __init__(self, directory=DOCUMENT_CACHE_DIR, max_bytes=DOCUMENT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._objects = os.path.join(directory, 'objects')
+        self._keys = os.path.join(directory, 'keys')
+        self._lock = threading.Lock()
+        self._size = None  # bytes of cached documents, unknown until the first scan
+        self._puts_since_scan = 0
+
+    def _object_path(self, digest):
+        return os.path.join(self._objects, digest[:2], digest)
+
+    def _key_path(self, key):
+        return os.path.join(self._keys, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def get(self, key):
+        """Return (content, metadata) for key; content is None when the document is not cached"""
+        try:
+            with open(self._key_path(key), 'rb') as key_file:
+                entry = json.loads(key_file.read())
+        except (OSError, ValueError):
+            return None, {}
+        digest = entry.get('digest') if isinstance(entry, dict) else None
+        if not isinstance(digest, str):
+            # A malformed key file is a miss; the next put overwrites it
+            return None, {}
+
+        metadata = entry.get('metadata', {})
+        object_path = self._object_path(digest)
+        try:
+            with open(object_path, 'rb') as object_file:
+                content = object_file.read()
+            os.utime(object_path)
+        except OSError:
+            # Evicted by this or another process since the key was written
+            return None, metadata
+        if hashlib.sha256(content).hexdigest() != digest:
+            return None, metadata
+        return content, metadata
+
+    def put(self, key, content, **metadata):
+        """Cache content under key with optional metadata (e.g. etag)
+
+        Caching is best-effort: I/O errors such as a full disk leave the document uncached.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        added = 0
+        try:
+            try:
+                os.utime(object_path)
+            except FileNotFoundError:
+                # Not cached yet, or evicted by another process since it was
+                _write_atomic(object_path, content)
+                added = len(content)
+            _write_atomic(self._key_path(key), json.dumps({'digest': digest, 'metadata': metadata}).encode('utf-8'))
+        except OSError:
+            return
+
+        with self._lock:
+            self._puts_since_scan += 1
+            if self._size is None or self._puts_since_scan >= RESCAN_INTERVAL:
+                self._size = self.size()
+                self._puts_since_scan = 0
+            else:
+                self._size += added
+            if self._size <= self.max_bytes:
+                return
+        self.evict()
+
+    def size(self):
+        """Total bytes of cached documents"""
+        return sum(size for _, size, _ in self._object_files())
+
+    def _object_files(self):
+        files = []
+        for root, _, names in os.walk(self._objects):
+            for name in names:
+                if name.startswith('.tmp-'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def evict(self):
+        """Delete least recently used documents, and the keys pointing to them, until the cache
+        fits in EVICTION_TARGET of max_bytes"""
+        with self._lock:
+            files = self._object_files()
+            total = sum(size for _, size, _ in files)
+            evicted = set()
+            if total > self.max_bytes:
+                target = self.max_bytes * EVICTION_TARGET
+                for path, size, _ in sorted(files, key=lambda item: item[2]):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        continue
+                    evicted.add(os.path.basename(path))
+                    total -= size
+                    if total <= target:
+                        break
+            self._size = total
+            self._puts_since_scan = 0
+
+        if evicted:
+            self._delete_keys(evicted)
+
+    def _delete_keys(self, digests):
+        """Delete the keys that point to any of digests"""
+        try:
+            names = os.listdir(self._keys)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith('.tmp-'):
+                continue
+            path = os.path.join(self._keys, name)
+            try:
+                with open(path, 'rb') as key_file:
+                    digest = json.loads(key_file.read()).get('digest')
+                if digest in digests:
+                    os.unlink(path)
+            except (OSError, ValueError):
+                continue
+
+
+_document_cache = None
+_document_cache_lock = threading.Lock()
+
+
+def get_document_cache():
+    """The process-wide DocumentCache"""
+    global _document_cache
+    with _document_cache_lock:
+        if _document_cache is None:
+            _document_cache = DocumentCache()
+        return _document_cache
@@ -0,0 +1,114 @@
+import heapq
+import math
+from collections import Counter
+
+
+class DocumentCorpus:
+    """Tokenized document collection with an inverted index and document frequencies
+
+    Each document is tokenized once when added; IDF and TF-IDF lookups then only touch the
+    query terms. Documents can be added, replaced and removed as mastersheet rows change.
+    """
+
+    def __init__(self, tokenize=None):
+        self.tokenize = tokenize or (lambda text: text.lower().split())
+        # doc_id -> term frequencies, and term -> {doc_id: term frequency}
+        self.term_frequencies = {}
+        self.postings = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+
+    @classmethod
+    def from_texts(cls, texts, tokenize=None):
+        """Build a corpus from texts, using each text's position as its document id"""
+        corpus = cls(tokenize)
+        for doc_id, text in enumerate(texts):
+            corpus.add_document(doc_id, text)
+        return corpus
+
+    def __len__(self):
+        return len(self.term_frequencies)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.term_frequencies
+
+    def add_document(self, doc_id, text):
+        """Add a document, replacing any previous version stored under the same id"""
+        if doc_id in self.term_frequencies:
+            self.remove_document(doc_id)
+
+        tokens = self.tokenize(text) if isinstance(text, str) else []
+        term_frequencies = Counter(tokens)
+        self.term_frequencies[doc_id] = term_frequencies
+        self.doc_lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+        for term, freq in term_frequencies.items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+
+    def remove_document(self, doc_id):
+        """Remove a document from the corpus; unknown ids are ignored"""
+        term_frequencies = self.term_frequencies.pop(doc_id, None)
+        if term_frequencies is None:
+            return
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in term_frequencies:
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+
+    def document_frequency(self, term):
+        """Number of documents containing term"""
+        return len(self.postings.get(term, ()))
+
+    def idf(self, term):
+        """Inverse document frequency, log(N / (1 + df)) as in NLPMatcher.compute_tf_idf"""
+        doc_count = len(self.term_frequencies)
+        if doc_count == 0:
+            return 0.0
+        return math.log(doc_count / (1 + self.document_frequency(term)))
+
+    def tf_idf(self, text):
+        """TF-IDF vector of a query text against the corpus"""
+        tf = Counter(self.tokenize(text))
+        return {term: freq * self.idf(term) for term, freq in tf.items()}
+
+    def document_tf_idf(self, doc_id):
+        """TF-IDF vector of a stored document"""
+        return {term: freq * self.idf(term) for term, freq in self.term_frequencies[doc_id].items()}
+
+    def bm25_idf(self, term):
+        """Okapi BM25 inverse document frequency (never negative)"""
+        doc_count = len(self.term_frequencies)
+        doc_freq = self.document_frequency(term)
+        return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def bm25_scores(self, query_terms, k1=1.5, b=0.75):
+        """BM25 score of every document sharing a term with the query
+
+        query_terms is an iterable of terms or a mapping of term -> weight; only the postings
+        of the query terms are visited.
+        """
+        if not self.term_frequencies:
+            return {}
+        if not isinstance(query_terms, dict):
+            query_terms = Counter(query_terms)
+
+        average_length = self.total_length / len(self.term_frequencies) or 1
+        doc_lengths = self.doc_lengths
+        scores = {}
+        for term, weight in query_terms.items():
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.bm25_idf(term) * weight
+            for doc_id, freq in posting.items():
+                norm = k1 * (1 - b + b * doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (k1 + 1) / (freq + norm)
+        return scores
+
+    def top_k(self, query_terms, k=10, k1=1.5, b=0.75):
+        """Return the k best (doc_id, score) pairs for a query, best first"""
+        scores = self.bm25_scores(query_terms, k1, b)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
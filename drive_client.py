@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+
+import google_auth_httplib2
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+
+DRIVE_SCOPES = ('https://www.googleapis.com/auth/drive.readonly',)
+
+
+class CredentialsNotFoundError(ValueError):
+    """GOOGLE_CREDENTIALS is not set"""
+
+
+class _SharedCredentials(service_account.Credentials):
+    """Service account credentials shared by every thread, with token refreshes serialized"""
+
+    _refresh_lock = threading.Lock()
+
+    def refresh(self, request):
+        with self._refresh_lock:
+            # Threads that waited for the lock find the token another thread just refreshed
+            if self.valid:
+                return
+            super().refresh(request)
+
+
+class GoogleClientProvider:
+    """Process-wide, thread-safe provider of Google API clients
+
+    Credentials are parsed once per GOOGLE_CREDENTIALS value and scopes, and shared so every
+    thread reuses the same access token until it needs refreshing. Service objects and their
+    httplib2 connections are not thread-safe, so each thread builds its own once and keeps it,
+    with its keep-alive connection, for every later request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._credentials = {}  # (GOOGLE_CREDENTIALS, scopes) -> credentials
+        self._local = threading.local()
+
+    def credentials(self, scopes=DRIVE_SCOPES):
+        """Shared service account credentials for scopes"""
+        creds_json = os.getenv('GOOGLE_CREDENTIALS')
+        if not creds_json:
+            raise CredentialsNotFoundError("Google credentials not found")
+
+        key = (creds_json, tuple(scopes))
+        with self._lock:
+            # A forked worker process must not share connections with its parent
+            if self._pid != os.getpid():
+                self._reset()
+            credentials = self._credentials.get(key)
+            if credentials is None:
+                credentials = self._credentials[key] = _SharedCredentials.from_service_account_info(
+                    json.loads(creds_json), scopes=list(scopes))
+        return credentials
+
+    def service(self, name, version, scopes):
+        """This thread's client for an API, built on first use"""
+        credentials = self.credentials(scopes)
+        services = getattr(self._local, 'services', None)
+        if services is None:
+            services = self._local.services = {}
+
+        key = (name, version, id(credentials))
+        service = services.get(key)
+        if service is None:
+            http = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+            service = services[key] = build(name, version, http=http, cache_discovery=False)
+        return service
+
+
+_provider = GoogleClientProvider()
+
+
+def get_drive_service():
+    """The calling thread's Drive v3 client with read-only access"""
+    return _provider.service('drive', 'v3', DRIVE_SCOPES)
+
+
+# File metadata used to validate cached documents, skip unsupported files and plan downloads
+DRIVE_METADATA_FIELDS = 'mimeType,size,md5Checksum,modifiedTime'
+
+# Most calls Drive accepts in one batch request
+DRIVE_BATCH_SIZE = 100
+
+# Retries, with exponential backoff, of a Drive call that hits a rate limit (429, or 403
+# userRateLimitExceeded), a 5xx or a connection error; concurrent downloads hit the rate limit
+DRIVE_NUM_RETRIES = 5
+
+
+def is_terminal_drive_error(exception):
+    """Whether a Drive lookup failed for good (file missing or not shared), rather than because
+    of rate limits or server errors that a request of its own may get past"""
+    status = getattr(getattr(exception, 'resp', None), 'status', None)
+    if status == 404:
+        return True
+    if status != 403:
+        return False
+    try:
+        errors = json.loads(exception.content).get('error', {}).get('errors', [])
+    except (AttributeError, TypeError, ValueError):
+        return False
+    reasons = [error.get('reason', '') for error in errors]
+    # 403 also reports rate and quota limits (userRateLimitExceeded, dailyLimitExceeded, ...)
+    return bool(reasons) and not any('limit' in reason.lower() or 'quota' in reason.lower() for reason in reasons)
+
+
+def fetch_drive_metadata(file_ids, fields=DRIVE_METADATA_FIELDS, batch_size=DRIVE_BATCH_SIZE):
+    """Look up the metadata of many Drive files with batch requests of up to batch_size calls
+
+    Returns ({file id: metadata}, errors). metadata is the file's metadata dict, or the HttpError
+    of a lookup that failed for good (see is_terminal_drive_error). Files whose lookups hit a
+    retryable error, or whose batch failed as a whole, are left out; errors lists the exceptions
+    of the failed batches, whose neighbours' results are kept.
+    """
+    service = get_drive_service()
+    file_ids = list(dict.fromkeys(file_ids))
+    metadata = {}
+    errors = []
+
+    def store(request_id, response, exception):
+        if exception is None:
+            metadata[request_id] = response
+        elif is_terminal_drive_error(exception):
+            metadata[request_id] = exception
+
+    for start in range(0, len(file_ids), batch_size):
+        batch = service.new_batch_http_request(callback=store)
+        for file_id in file_ids[start:start + batch_size]:
+            batch.add(service.files().get(fileId=file_id, fields=fields), request_id=file_id)
+        try:
+            batch.execute()
+        except Exception as e:
+            errors.append(e)
+    return metadata, errors
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+FEATURE_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cv_features.db')
+
+# Bump when the features extracted from a CV change shape or meaning
+FEATURE_FORMAT = 2
+
+
+def content_hash(text):
+    """SHA-256 of a CV's text, the identity of its stored features"""
+    return hashlib.sha256(str(text).encode('utf-8')).hexdigest()
+
+
+class CVFeatures:
+    """Everything ScoringEngine needs from one CV to score it against any job
+
+    tokens holds the CV's distinct whitespace tokens joined by newlines. A role word contains no
+    whitespace, so it occurs in the CV text exactly when it occurs in tokens. years_experience
+    comes from the sheet row rather than the CV text, so it is never stored: stored features have
+    None, and with_years attaches a row's years before scoring.
+    """
+
+    __slots__ = ('content_hash', 'skills', 'years_experience', 'has_text', 'backend_matches',
+                 'responsibility_matches', 'proficiency_tier', 'tokens')
+
+    def __init__(self, content_hash, skills, years_experience, has_text, backend_matches,
+                 responsibility_matches, proficiency_tier, tokens):
+        self.content_hash = content_hash
+        self.skills = skills
+        self.years_experience = years_experience
+        self.has_text = has_text
+        self.backend_matches = backend_matches
+        self.responsibility_matches = responsibility_matches
+        self.proficiency_tier = proficiency_tier
+        self.tokens = tokens
+
+    def with_years(self, years_experience):
+        """A copy of these features for a row with years_experience"""
+        features = CVFeatures(*(getattr(self, name) for name in self.__slots__))
+        features.years_experience = years_experience
+        return features
+
+    def to_json(self):
+        return json.dumps([getattr(self, name) for name in self.__slots__[1:]])
+
+    @classmethod
+    def from_json(cls, content_hash, data):
+        return cls(content_hash, *json.loads(data))
+
+
+class FeatureStore:
+    """SQLite store of CVFeatures keyed by CV content hash and extractor version
+
+    Features stored by another extractor version are never returned, so changing the taxonomy
+    or keyword lists re-extracts CVs instead of scoring them from stale features.
+    """
+
+    def __init__(self, path=FEATURE_STORE_PATH, version=''):
+        self.path = path
+        self.version = version
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cv_features ("
+                "content_hash TEXT NOT NULL, version TEXT NOT NULL, features TEXT NOT NULL, "
+                "PRIMARY KEY (content_hash, version))"
+            )
+
+    def __len__(self):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM cv_features WHERE version = ?", (self.version,)).fetchone()
+        return row[0]
+
+    def get_many(self, content_hashes):
+        """Return {content hash: CVFeatures} for the hashes stored under this version"""
+        content_hashes = list(dict.fromkeys(content_hashes))
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's limit on bound parameters
+            for start in range(0, len(content_hashes), 500):
+                batch = content_hashes[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT content_hash, features FROM cv_features WHERE version = ? "
+                    f"AND content_hash IN ({', '.join('?' * len(batch))})",
+                    (self.version, *batch)
+                )
+                for stored_hash, data in rows:
+                    found[stored_hash] = CVFeatures.from_json(stored_hash, data)
+        return found
+
+    def get(self, content_hash):
+        """Return the stored CVFeatures for a content hash, or None"""
+        return self.get_many([content_hash]).get(content_hash)
+
+    def put_many(self, features):
+        """Store features, replacing any stored under the same hash and version"""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO cv_features (content_hash, version, features) VALUES (?, ?, ?)",
+                [(item.content_hash, self.version, item.to_json()) for item in features]
+            )
+
+    def load_all(self):
+        """Every CVFeatures stored under this version"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT content_hash, features FROM cv_features WHERE version = ?", (self.version,)).fetchall()
+        return [CVFeatures.from_json(stored_hash, data) for stored_hash, data in rows]
+
+    def prune(self):
+        """Delete features stored by other extractor versions"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cv_features WHERE version != ?", (self.version,))
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,137 @@
+import numpy as np
+
+from phrase_automaton import PhraseAutomaton
+
+# Joins candidate skills for one automaton pass; no skill or variation contains it, so
+# no match can span two candidates
+_SKILL_SEPARATOR = '\x00'
+
+
+class JobMatcher:
+    """Job requirements compiled once so each CV is matched with set lookups and one automaton pass
+
+    Scores and matched skills are identical to NLPMatcher.match_skills.
+    """
+
+    def __init__(self, job_requirements, skill_variations):
+        self.required_skills = list(job_requirements.get('required_skills', []))
+        self.nice_to_have_skills = list(job_requirements.get('nice_to_have_skills', []))
+
+        # (original skill, lowered skill, its variations or None) in requirement order
+        self.required = self._compile(self.required_skills, skill_variations)
+        self.nice_to_have = self._compile(self.nice_to_have_skills, skill_variations)
+
+        # Repeated requirement strings always match alike, so batch matching only needs each once
+        self.distinct_required = self._compile(dict.fromkeys(self.required_skills), skill_variations)
+        self.distinct_nice_to_have = self._compile(dict.fromkeys(self.nice_to_have_skills), skill_variations)
+
+        # Every lowered skill and variation, to find which occur inside a candidate skill
+        phrases = []
+        for _, req_lower, variations in self.required + self.nice_to_have:
+            phrases.append(req_lower)
+            phrases.extend(variations or ())
+        self.automaton = PhraseAutomaton(phrases)
+
+    @staticmethod
+    def _compile(skills, skill_variations):
+        compiled = []
+        for skill in skills:
+            req_lower = skill.lower().strip()
+            variations = skill_variations.get(req_lower)
+            compiled.append((skill, req_lower, tuple(variations) if variations is not None else None))
+        return compiled
+
+    def scan_candidate(self, candidate_skills):
+        """Lowered candidate skills and the job phrases contained in at least one of them"""
+        candidate_lowers = [skill.lower() for skill in candidate_skills]
+        found = self.automaton.find_all(_SKILL_SEPARATOR.join(candidate_lowers))
+        # The empty string is contained in every candidate
+        found.add('')
+        return set(candidate_lowers), found
+
+    def _match(self, compiled, candidate_skills, scan):
+        if not candidate_skills or not compiled:
+            return 0, []
+
+        candidate_set, found = scan
+        matched_skills = []
+        partially_matched = set()
+        matched_count = 0
+        for req_skill, req_lower, variations in compiled:
+            # Direct match (100% match)
+            if req_lower in candidate_set:
+                matched_skills.append(req_skill)
+                matched_count += 1
+                continue
+
+            # Variation match (100% match): a variation occurs inside some candidate skill
+            if variations is not None and any(var in found for var in variations):
+                matched_skills.append(req_skill)
+                matched_count += 1
+                continue
+
+            # Partial match (80% match), credited once per distinct requirement string
+            if req_lower in found and req_skill not in partially_matched:
+                partially_matched.add(req_skill)
+                matched_skills.append(req_skill)
+                matched_count += 0.8
+
+        score = (matched_count / len(compiled)) * 100
+        return score, list(set(matched_skills))
+
+    def match_required(self, candidate_skills, scan=None):
+        """Match candidate skills against the required skills, as (score, matched skills)"""
+        if scan is None and candidate_skills:
+            scan = self.scan_candidate(candidate_skills)
+        return self._match(self.required, candidate_skills, scan)
+
+    def match_nice_to_have(self, candidate_skills, scan=None):
+        """Match candidate skills against the nice-to-have skills, as (score, matched skills)"""
+        if scan is None and candidate_skills:
+            scan = self.scan_candidate(candidate_skills)
+        return self._match(self.nice_to_have, candidate_skills, scan)
+
+    def match_candidate(self, candidate_skills):
+        """Match a candidate against both skill lists with a single scan"""
+        scan = self.scan_candidate(candidate_skills) if candidate_skills else None
+        return (self.match_required(candidate_skills, scan),
+                self.match_nice_to_have(candidate_skills, scan))
+
+    def _requirement_matrix(self, compiled, skill_names, found_phrases):
+        """Boolean (skill x requirement) matrix of which candidate skills satisfy which requirements"""
+        matrix = np.zeros((len(skill_names), len(compiled)), dtype=bool)
+        # Only an empty requirement or variation can match a skill that contains no job phrase
+        has_empty = any(req_lower == '' or '' in (variations or ()) for _, req_lower, variations in compiled)
+        for row, (skill, found) in enumerate(zip(skill_names, found_phrases)):
+            if len(found) == 1 and not has_empty:
+                continue
+            for column, (_, req_lower, variations) in enumerate(compiled):
+                # Direct, variation or partial match, as in match_skills
+                matrix[row, column] = (req_lower == skill
+                                       or (variations is not None and any(var in found for var in variations))
+                                       or req_lower in found)
+        return matrix
+
+    def match_matrix(self, skill_matrix):
+        """Matched requirements for a whole batch of CVs
+
+        Returns boolean (CV x requirement) matrices for distinct_required and distinct_nice_to_have.
+        Each distinct candidate skill is matched against the job once, then CVs are combined with
+        a matrix product instead of matching every CV separately.
+        """
+        skill_ids = skill_matrix.skill_ids()
+        skill_names = [skill_matrix.vocabulary.skills[skill_id] for skill_id in skill_ids]
+        found_phrases = [self.automaton.find_all(name) | {''} for name in skill_names]
+
+        required = self._requirement_matrix(self.distinct_required, skill_names, found_phrases)
+        nice_to_have = self._requirement_matrix(self.distinct_nice_to_have, skill_names, found_phrases)
+
+        # Only skills that satisfy at least one requirement need a column in the CV matrix
+        relevant = required.any(axis=1) | nice_to_have.any(axis=1)
+        cv_matrix = skill_matrix.dense(skill_ids[relevant]).astype(np.int32)
+        return (cv_matrix @ required[relevant].astype(np.int32) > 0,
+                cv_matrix @ nice_to_have[relevant].astype(np.int32) > 0)
+
+    def matched_skills(self, compiled, matched_row):
+        """Matched skills of one CV from a match_matrix row, as match_skills would list them"""
+        return list(set(skill for (skill, _, _), matched in zip(compiled, matched_row) if matched))
@@ -0,0 +1,32 @@
+from collections import Counter
+
+from phrase_automaton import PhraseAutomaton
+
+
+class KeywordScanner:
+    """Counts the keyword hits of several keyword groups with a single pass over the text
+
+    A group's count is the number of its list entries that occur in the text, so a keyword
+    listed twice counts twice, exactly like sum(1 for kw in keywords if kw in text).
+    """
+
+    def __init__(self, groups):
+        self.groups = {name: Counter(keywords) for name, keywords in groups.items()}
+        self.automaton = PhraseAutomaton(keyword for keywords in self.groups.values() for keyword in keywords)
+
+        # Keyword -> [(group, number of times the group lists it)]
+        self.keyword_groups = {}
+        for name, keywords in self.groups.items():
+            for keyword, times in keywords.items():
+                self.keyword_groups.setdefault(keyword, []).append((name, times))
+
+        # The empty keyword occurs in every text, so it is counted up front
+        self.base_counts = {name: keywords.get('', 0) for name, keywords in self.groups.items()}
+
+    def count(self, text):
+        """Return {group: number of its keywords found in text}"""
+        counts = dict(self.base_counts)
+        for keyword in self.automaton.find_all(text):
+            for name, times in self.keyword_groups[keyword]:
+                counts[name] += times
+        return counts
@@ -2,10 +2,11 @@ import streamlit as st
 import pandas as pd
 from google_sheet_client import GoogleSheetClient
 from scoring_engine import ScoringEngine
-from utils import parse_job_description, prepare_export_data, calculate_years_experience
+from utils import parse_job_description, prepare_export_data
 from nlp_matcher import NLPMatcher
 from deepseek_evaluator import DeepseekEvaluator
-from mastersheet_processor import process_mastersheet
+from mastersheet_processor import process_mastersheet, finalize_mastersheet
+from cv_pipeline import CVPipeline
 
 def main():
     st.set_page_config(page_title="CV Evaluator", layout="wide")
@@ -73,10 +74,18 @@ def main():
             value=True,
             help="Uncheck this if you don't want column titles to be included in the output (useful when appending to existing data)."
         )
+
+        # Option to resume an interrupted run
+        resume_run = st.checkbox(
+            "Resume Previous Run",
+            value=False,
+            help="Skip the rows already processed by an interrupted run over the same sheet range."
+        )
         
         # Use a form for the button to ensure proper handling
         with st.form(key="mastersheet_form"):
             submit_button = st.form_submit_button(label="Process Mastersheet")
+            finalize_button = st.form_submit_button(label="Write Journaled Results")
             
             if submit_button:
                 print("Process Mastersheet button clicked!")
@@ -87,10 +96,18 @@ def main():
                     # Call the mastersheet processing function
                     print(f"Calling process_mastersheet with: {sheet_id}, {mastersheet_range}, {output_range}")
                     try:
-                        process_mastersheet(sheet_id, mastersheet_range, output_range, include_headers)
+                        process_mastersheet(sheet_id, mastersheet_range, output_range, include_headers,
+                                            resume=resume_run)
                     except Exception as e:
                         st.error(f"Error processing mastersheet: {str(e)}")
                         print(f"Exception in process_mastersheet: {str(e)}")
+
+            if finalize_button:
+                if not sheet_id:
+                    st.error("Please provide a Google Sheet ID")
+                else:
+                    # Write the results journaled by an interrupted run without processing any CV
+                    finalize_mastersheet(sheet_id, mastersheet_range, output_range, include_headers)
     
     # CV Evaluation Tab
     with tab1:
@@ -174,12 +191,10 @@ def main():
                     progress_bar = st.progress(0)
                     progress_text = st.empty()
                     
+                    # Sheet fields of each row, as (cv_name, email, cv_link, start_date_str, sheet_years)
+                    pending_rows = []
+
                     for index, row in cv_data.iterrows():
-                        # Update progress
-                        progress = (index + 1) / total_cvs
-                        progress_bar.progress(progress)
-                        progress_text.text(f"Processing CV {index + 1} of {total_cvs}")
-                        
                         # Try different possible column names for first and last name
                         first_name_cols = ['FIRST NAME', 'First Name', 'first name', 'First_Name', 'first_name', 'FirstName']
                         last_name_cols = ['LAST NAME', 'Last Name', 'last name', 'Last_Name', 'last_name', 'LastName']
@@ -257,12 +272,6 @@ def main():
                                 if start_date_str:  # If we found a non-empty date, use it
                                     break
                         
-                        # Calculate years of experience and get CV content
-                        years_exp, _, cv_content = calculate_years_experience(
-                            cv_url=cv_link,
-                            start_date_str=start_date_str
-                        )
-                        
                         # Try different possible column names for email
                         email_cols = ['EMAIL', 'Email', 'email', 'E-mail', 'e-mail', 'Contact Email']
                         
@@ -293,6 +302,21 @@ def main():
                                     # If conversion fails, continue to the next column
                                     pass
                         
+                        pending_rows.append((cv_name, email, cv_link, start_date_str, sheet_years))
+
+                    # Download CVs concurrently while a process pool parses them and extracts skills;
+                    # results arrive in row order
+                    pipeline = CVPipeline(nlp_matcher=scoring_engine.nlp_matcher)
+                    cv_results = pipeline.run((cv_link, start_date_str)
+                                              for _, _, cv_link, start_date_str, _ in pending_rows)
+                    for done, (row_fields, cv_result) in enumerate(zip(pending_rows, cv_results), 1):
+                        cv_name, email, cv_link, _, sheet_years = row_fields
+                        years_exp, _, cv_content, technical_skills, document, _ = cv_result
+
+                        # Update progress
+                        progress_bar.progress(done / total_cvs)
+                        progress_text.text(f"Processing CV {done} of {total_cvs}")
+
                         # If we have years from the sheet and not from CV parsing, use that
                         if sheet_years is not None and (years_exp == 0 or years_exp is None):
                             years_exp = sheet_years
@@ -303,11 +327,13 @@ def main():
                             'email': email or "None",
                             'cv_link': cv_link or "None",
                             'years_experience': years_exp,
-                            'cv_text': cv_content if isinstance(cv_content, str) else str(cv_content)
+                            # The pipeline's CVDocument, so scoring reuses its lowered text and tokens
+                            'cv_text': document if document is not None else str(cv_content)
                         }
                         
-                        # Evaluate CV
-                        result = scoring_engine.evaluate_cv(cv_dict, job_requirements)
+                        # Evaluate CV, reusing the skills extracted by the pipeline
+                        result = scoring_engine.evaluate_cv(cv_dict, job_requirements,
+                                                            technical_skills=technical_skills)
                         
                         # Get suggested positions
                         from mastersheet_processor import suggest_positions
@@ -1,19 +1,20 @@
 import streamlit as st
 import pandas as pd
-import time
 from datetime import datetime
 import re
 
 from google_sheet_client import GoogleSheetClient
 from nlp_matcher import NLPMatcher
-from utils import get_google_drive_file_url, parse_document_for_experience, calculate_years_experience
+from utils import MAX_DOCUMENT_BYTES, get_google_drive_file_url, parse_document_for_experience
+from run_journal import RUN_JOURNAL_PATH, RunJournal, run_key
+from cv_pipeline import CVPipeline
 
 def suggest_positions(technical_skills):
     """Suggest potential positions based on technical skills"""
     positions = set()  # Using set to avoid duplicates
 
-    # Convert skills list to lowercase for matching
-    skills = [skill.lower() for skill in technical_skills]
+    # Convert skills to a lowercase set for matching
+    skills = {skill.lower() for skill in technical_skills}
 
     # Backend Development
     if any(x in skills for x in ['python', 'java', 'nodejs', 'django', 'flask', 'fastapi', 'spring', 'express.js', 'nestjs']):
@@ -106,7 +107,83 @@ def suggest_positions(technical_skills):
 
     return sorted(list(positions)) if positions else ["Entry Level Developer"]
 
-def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=True):
+def _record_row(data, journal, index, cv_link, skills, roles, reason, status='done', **columns):
+    """Set a finished row's result columns and commit them to the run journal"""
+    outcome = {'Extracted Skills': skills, 'Suggested Roles': roles, **columns, 'Processing Reason': reason}
+    for column, value in outcome.items():
+        data.at[index, column] = value
+    journal.record_outcome(index, cv_link, outcome, status)
+
+
+def _skills_outcome(technical_skills, years_exp):
+    """Result columns of a row whose CV text was found, from its extracted skills"""
+    if technical_skills:
+        # Calculate suggested roles
+        suggested_positions = suggest_positions(technical_skills)
+
+        # Update the dataframe with extracted information
+        return {
+            'Extracted Skills': ", ".join(technical_skills),
+            'Suggested Roles': ", ".join(suggested_positions) if suggested_positions else "None",
+            'Calculated YOE': float(years_exp) if years_exp is not None else None,
+            'Processing Reason': "Successfully processed"
+        }
+    reason = "CV content found but no technical skills detected"
+    return {'Extracted Skills': "None", 'Suggested Roles': "None", 'Processing Reason': reason}
+
+
+def _write_results(google_client, data, sheet_id, output_range, include_headers, journal):
+    """Write the result columns back to the sheet, marking the journaled run finished on success"""
+    try:
+        st.subheader("Saving Results")
+        with st.spinner("Updating Google Sheet with extracted information..."):
+            # Determine columns to write back
+            columns_to_update = ['Extracted Skills', 'Suggested Roles', 'Calculated YOE', 'Processing Reason']
+            update_df = data[columns_to_update]
+
+            # Show user whether headers will be included
+            if include_headers:
+                st.info("Including headers/titles in the output")
+            else:
+                st.info("Skipping headers/titles in the output (as specified)")
+
+            # Hack: For custom header handling when the write_to_sheet doesn't respect include_headers directly
+            # We'll manipulate the output range if headers should be skipped
+            actual_output_range = output_range
+            if not include_headers:
+                # Extract the sheet name and starting cell from the output range
+                match = re.search(r'([^!]+)!([A-Z]+)(\d+)', output_range)
+                if match:
+                    sheet_name = match.group(1)
+                    col_letter = match.group(2)
+                    row_num = int(match.group(3))
+
+                    # If we're modifying row 1, we need a special indicator
+                    if row_num == 1:
+                        # Append a special parameter that will be detected in google_sheet_client.py
+                        actual_output_range = f"{sheet_name}!{col_letter}{row_num}_NOHEADER"
+
+            # Write to Google Sheet
+            google_client.write_to_sheet(sheet_id, actual_output_range, update_df)
+            st.success("Successfully updated the mastersheet with extracted information!")
+            journal.finish()
+
+            # Offer download of processed data
+            csv = data.to_csv(index=False)
+            st.download_button(
+                label="Download Processed Data as CSV",
+                data=csv,
+                file_name="mastersheet_processed.csv",
+                mime="text/csv"
+            )
+    except Exception as e:
+        st.error(f"Failed to update mastersheet: {str(e)}")
+        st.info("Make sure you've shared your sheet with edit permissions to the Service Account Email.")
+
+
+def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=True, extraction_workers=None,
+                        resume=False, journal_path=RUN_JOURNAL_PATH, download_workers=8,
+                        max_document_bytes=MAX_DOCUMENT_BYTES):
     """
     Process a large mastersheet and extract skills, suggested roles, and calculated years of experience
     Then update the original sheet with this information
@@ -116,6 +193,11 @@ def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=Tru
         sheet_range: Range to read from (e.g., 'mastersheet!A1:Z2000')
         output_range: Range where results will be written (e.g., 'mastersheet!AA1')
         include_headers: Whether to include header/title row in the output (default: True)
+        extraction_workers: Processes used to parse CVs and extract skills (default: one per CPU core)
+        resume: Skip the rows finished by an earlier, interrupted run over the same sheet range
+        journal_path: SQLite file journaling each row's outcome as it completes
+        download_workers: CV downloads in flight at once
+        max_document_bytes: Largest CV file downloaded; bigger files are reported as too large
     """
     print("Starting process_mastersheet function")
     # Header was moved from here to main.py tab2
@@ -149,6 +231,13 @@ def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=Tru
         for col in ['Extracted Skills', 'Suggested Roles', 'Calculated YOE', 'Processing Reason']:
             if col not in data.columns:
                 data[col] = None
+
+        # Journal every row's outcome so an interrupted run can resume where it stopped
+        journal = RunJournal(run_key(sheet_id, sheet_range), journal_path)
+        journal.start(resume)
+        completed_rows = journal.completed() if resume else {}
+        if resume:
+            st.info(f"Resuming run: {len(completed_rows)} rows already processed")
         
         # Count all rows to process
         rows_to_process = len(data)
@@ -156,6 +245,10 @@ def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=Tru
         
         # Reset counters for actual processing
         processed_count = 0
+
+        # Rows with a CV link to download, as (index, cv_link); they go through the download and
+        # parse pipeline once every row has been read
+        pending_downloads = []
         
         for index, row in data.iterrows():
                 
@@ -254,6 +347,13 @@ def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=Tru
                         if cv_link:  # If we found a non-empty link, use it
                             break
             
+            # Rows finished by an earlier attempt of this run keep their journaled outcome
+            completed_row = completed_rows.get(int(index))
+            if completed_row is not None and completed_row[0] == cv_link:
+                for column, value in completed_row[1].items():
+                    data.at[index, column] = value
+                continue
+
             if cv_link:
                 # Check if it's a valid CV link (not just any text)
                 is_valid_link = cv_link.startswith('http') and ('drive.google.com' in cv_link or 'docs.google.com' in cv_link)
@@ -261,54 +361,13 @@ def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=Tru
                 if not is_valid_link:
                     reason = f"Found text in CV column but it's not a valid link: '{cv_link[:30]}...'"
                     current_status.text(reason)
-                    data.at[index, 'Extracted Skills'] = "Error: Invalid link format"
-                    data.at[index, 'Suggested Roles'] = "Error: Invalid link format"
-                    data.at[index, 'Processing Reason'] = reason
+                    _record_row(data, journal, index, cv_link,
+                                "Error: Invalid link format", "Error: Invalid link format", reason)
                     continue
                 
                 current_status.text(f"Processing CV link from column '{matched_col}': {cv_link}")
-                try:
-                    # Calculate years of experience and get CV content
-                    years_exp, _, cv_content = calculate_years_experience(cv_url=cv_link)
-                    
-                    # Extract skills
-                    current_status.text(f"Extracting skills from CV...")
-                    if cv_content:
-                        # Check if content was actually obtained (not just whitespace)
-                        if cv_content.strip():
-                            technical_skills = nlp_matcher.extract_technical_skills(cv_content)
-                            
-                            if technical_skills:
-                                # Calculate suggested roles
-                                suggested_positions = suggest_positions(technical_skills)
-                                
-                                # Update the dataframe with extracted information
-                                data.at[index, 'Extracted Skills'] = ", ".join(technical_skills)
-                                data.at[index, 'Suggested Roles'] = ", ".join(suggested_positions) if suggested_positions else "None"
-                                data.at[index, 'Calculated YOE'] = float(years_exp) if years_exp is not None else None
-                                data.at[index, 'Processing Reason'] = "Successfully processed"
-                            else:
-                                reason = "CV content found but no technical skills detected"
-                                data.at[index, 'Extracted Skills'] = "None"
-                                data.at[index, 'Suggested Roles'] = "None" 
-                                data.at[index, 'Processing Reason'] = reason
-                        else:
-                            reason = "CV content was empty or whitespace only"
-                            data.at[index, 'Extracted Skills'] = "None"
-                            data.at[index, 'Suggested Roles'] = "None"
-                            data.at[index, 'Processing Reason'] = reason
-                    else:
-                        reason = "Could not extract content from CV file"
-                        data.at[index, 'Extracted Skills'] = "None"
-                        data.at[index, 'Suggested Roles'] = "None" 
-                        data.at[index, 'Processing Reason'] = reason
-                except Exception as e:
-                    error_msg = str(e)
-                    reason = f"Error: {error_msg[:100]}"
-                    current_status.text(f"Error processing CV: {reason}")
-                    data.at[index, 'Extracted Skills'] = "None"
-                    data.at[index, 'Suggested Roles'] = "None"
-                    data.at[index, 'Processing Reason'] = reason
+                # Queue the CV for the download and parse pipeline
+                pending_downloads.append((index, cv_link))
             else:
                 # If we have reached this point, no CV link column was found or the value was empty
                 if processed_count == 1:
@@ -322,13 +381,37 @@ def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=Tru
                 
                 reason = "No CV link found in this row"
                 current_status.text(reason)
-                data.at[index, 'Extracted Skills'] = "None"
-                data.at[index, 'Suggested Roles'] = "None"
-                data.at[index, 'Processing Reason'] = reason
-            
-            # Add a small delay to avoid rate limits
-            time.sleep(0.1)
-        
+                _record_row(data, journal, index, cv_link, "None", "None", reason)
+
+        # Download CVs concurrently (download_workers bounds the requests in flight) while a
+        # process pool parses them and extracts skills; results arrive in row order
+        if pending_downloads:
+            pipeline = CVPipeline(download_workers=download_workers, parse_workers=extraction_workers,
+                                  nlp_matcher=nlp_matcher, max_document_bytes=max_document_bytes)
+            results = pipeline.run((cv_link, None) for _, cv_link in pending_downloads)
+            for done, ((index, cv_link), result) in enumerate(zip(pending_downloads, results), 1):
+                years_exp, _, cv_content, technical_skills, _, fetch_error = result
+                progress_bar.progress(done / len(pending_downloads))
+                progress_text.text(f"Downloaded and parsed CV {done} of {len(pending_downloads)} (row {index + 1})")
+
+                if fetch_error:
+                    # Journaled for retry, so resuming the run downloads the CV again
+                    reason = f"Could not download CV: {fetch_error}"
+                    _record_row(data, journal, index, cv_link, "None", "None", reason, status='retry')
+                elif cv_content:
+                    # Check if content was actually obtained (not just whitespace)
+                    if cv_content.strip():
+                        outcome = _skills_outcome(technical_skills, years_exp)
+                        for column, value in outcome.items():
+                            data.at[index, column] = value
+                        journal.record_outcome(index, cv_link, outcome)
+                    else:
+                        reason = "CV content was empty or whitespace only"
+                        _record_row(data, journal, index, cv_link, "None", "None", reason)
+                else:
+                    reason = "Could not extract content from CV file"
+                    _record_row(data, journal, index, cv_link, "None", "None", reason)
+
         # Clear progress indicators
         progress_bar.empty()
         progress_text.empty()
@@ -340,50 +423,34 @@ def process_mastersheet(sheet_id, sheet_range, output_range, include_headers=Tru
         st.dataframe(data)
         
         # Save back to Google Sheet
-        try:
-            st.subheader("Saving Results")
-            with st.spinner("Updating Google Sheet with extracted information..."):
-                # Determine columns to write back
-                columns_to_update = ['Extracted Skills', 'Suggested Roles', 'Calculated YOE', 'Processing Reason']
-                update_df = data[columns_to_update]
-                
-                # Show user whether headers will be included
-                if include_headers:
-                    st.info("Including headers/titles in the output")
-                else:
-                    st.info("Skipping headers/titles in the output (as specified)")
-                
-                # Hack: For custom header handling when the write_to_sheet doesn't respect include_headers directly
-                # We'll manipulate the output range if headers should be skipped
-                actual_output_range = output_range
-                if not include_headers:
-                    # Extract the sheet name and starting cell from the output range
-                    match = re.search(r'([^!]+)!([A-Z]+)(\d+)', output_range)
-                    if match:
-                        sheet_name = match.group(1)
-                        col_letter = match.group(2)
-                        row_num = int(match.group(3))
-                        
-                        # If we're modifying row 1, we need a special indicator
-                        if row_num == 1:
-                            # Append a special parameter that will be detected in google_sheet_client.py
-                            actual_output_range = f"{sheet_name}!{col_letter}{row_num}_NOHEADER"
-                
-                # Write to Google Sheet
-                google_client.write_to_sheet(sheet_id, actual_output_range, update_df)
-                st.success("Successfully updated the mastersheet with extracted information!")
-                
-                # Offer download of processed data
-                csv = data.to_csv(index=False)
-                st.download_button(
-                    label="Download Processed Data as CSV",
-                    data=csv,
-                    file_name="mastersheet_processed.csv",
-                    mime="text/csv"
-                )
-        except Exception as e:
-            st.error(f"Failed to update mastersheet: {str(e)}")
-            st.info("Make sure you've shared your sheet with edit permissions to the Service Account Email.")
-            
+        _write_results(google_client, data, sheet_id, output_range, include_headers, journal)
+        journal.close()
+
     except Exception as e:
         st.error(f"An error occurred during mastersheet processing: {str(e)}")
+
+
+def finalize_mastersheet(sheet_id, sheet_range, output_range, include_headers=True, journal_path=RUN_JOURNAL_PATH):
+    """Write the journaled results of an interrupted run back to the sheet without processing any CV"""
+    try:
+        google_client = GoogleSheetClient()
+        journal = RunJournal(run_key(sheet_id, sheet_range), journal_path)
+        completed_rows = journal.outcomes()
+        if not completed_rows:
+            st.error("No journaled results found for this sheet range")
+            return
+
+        data = google_client.get_sheet_data(sheet_id, sheet_range)
+        for col in ['Extracted Skills', 'Suggested Roles', 'Calculated YOE', 'Processing Reason']:
+            if col not in data.columns:
+                data[col] = None
+        for index, (_, outcome) in completed_rows.items():
+            if index in data.index:
+                for column, value in outcome.items():
+                    data.at[index, column] = value
+
+        st.info(f"Writing {len(completed_rows)} journaled rows of {len(data)}")
+        _write_results(google_client, data, sheet_id, output_range, include_headers, journal)
+        journal.close()
+    except Exception as e:
+        st.error(f"An error occurred while finalizing the mastersheet: {str(e)}")
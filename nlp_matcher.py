@@ -1,315 +1,83 @@
+import os
 import re
 import math
 import streamlit as st
-from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from skill_similarity import SkillSimilarity, levenshtein_distance
+from skill_index import get_skill_index
+from skill_taxonomy import load_taxonomy
+from document_corpus import DocumentCorpus
+from cv_document import CVDocument
+from job_matcher import JobMatcher
+
+# Matcher of a batch extraction worker process, created once by _init_extraction_worker
+_worker_matcher = None
+
+def _init_extraction_worker(taxonomy=None):
+    """Build the worker's matcher from the compiled taxonomy before it receives any texts"""
+    global _worker_matcher
+    # Workers load the process-wide artifact themselves; only a custom taxonomy is sent along
+    _worker_matcher = NLPMatcher(taxonomy._freeze() if taxonomy is not None else None)
+
+def _extract_chunk(texts):
+    """Extract technical skills for one chunk of texts inside a worker process"""
+    return [_worker_matcher.extract_technical_skills(text) for text in texts]
 
 class NLPMatcher:
-    def __init__(self):
-        # Define skill variations and synonyms
-        self.skill_variations = {
-            'restful api': ['rest api', 'restful', 'rest', 'api development', 'web api', 'http api', 'rest apis'],
-            'aws': ['amazon web services', 'amazon aws', 'aws cloud', 'amazon', 'aws services'],
-            'docker': ['containerization', 'containers', 'docker containers', 'docker container'],
-            'kubernetes': ['k8s', 'container orchestration', 'kubernetes cluster', 'kube', 'azure kubernetes service', 'aks', 'gke', 'google kubernetes engine', 'kubernete'],
-            'postgresql': ['postgres', 'psql', 'database functions', 'database triggers', 'sql', 'postgresql'],
-            'mongodb': ['mongo', 'nosql', 'document database', 'document db'],
-            'mssql': ['ms sql', 'microsoft sql', 'sql server', 'ms sql server'],
-            'mysql': ['sql', 'relational database'],
-            'sql': ['sql database', 'relational database', 'database', 'query language'],
-            'rethinkdb': ['nosql', 'real-time database'],
-            'python': ['py', 'python3', 'python2', 'django', 'fastapi', 'flask', 'cpython', 'python programming', 'python development',
-                'asyncio', 'pydantic', 'sqlalchemy', 'pytest', 'poetry', 'alembic', 'boto3', 'streamlit', 'pyramid', 'tornado', 'celery',
-                'scipy', 'numpy', 'pandas', 'matplotlib', 'seaborn', 'scikit-learn', 'tensorflow', 'pytorch', 'keras',
-                'requests', 'beautifulsoup', 'scrapy', 'selenium', 'airflow', 'luigi', 'prefect', 'dash', 'plotly', 'pyspark',
-                'dask', 'ray', 'gunicorn', 'uvicorn', 'starlette', 'typer', 'click', 'pipenv', 'virtualenv', 'conda', 'jupyter',
-                'pillow', 'opencv', 'nltk', 'spacy', 'gensim', 'transformers', 'huggingface', 'langchain'],
-            'fastapi': ['fast api', 'fastapi framework', 'python fastapi', 'asynchronous api framework', 'python web framework'],
-            'asyncio': ['async io', 'python async', 'python asynchronous', 'async/await', 'async await', 'asyncio library', 'asynchronous'],
-            'boto3': ['aws sdk for python', 'aws boto', 'boto', 'aws python sdk', 'python aws', 'aws client'],
-            'sqlalchemy': ['sql alchemy', 'python orm', 'sa', 'sqlalchemy orm', 'database orm', 'python database', 'orm'],
-            'pydantic': ['data validation', 'python validation', 'type validation', 'schema validation', 'pydantic models'],
-            'pytest': ['python testing', 'pytest framework', 'python test', 'pytest-mock', 'pytest fixtures'],
-            'poetry': ['python package manager', 'python dependency manager', 'pyproject.toml', 'python dependency management'],
-            'alembic': ['database migration', 'sql migration', 'sqlalchemy migration', 'schema migration', 'db migration'],
-            'javascript': ['js', 'ecmascript', 'react', 'node.js', 'nodejs', 'node'],
-            'typescript': ['ts', 'typescript lang', 'typed javascript'],
-            'express': ['express.js', 'expressjs', 'express js', 'express framework'],
-            'express.js': ['express', 'nodejs framework', 'web framework'],
-            'expressjs': ['express', 'express.js', 'web framework'],
-            'nodejs': ['node.js', 'node js', 'javascript runtime'],
-            'react.js': ['react', 'reactjs', 'frontend framework'],
-            'react': ['react.js', 'reactjs', 'frontend library'],
-            'next.js': ['nextjs', 'react framework', 'ssr framework'],
-            'nextjs': ['next.js', 'react framework', 'ssr framework'],
-            'nestjs': ['nodejs framework', 'typescript framework', 'backend framework'],
-            'github actions': ['github workflows', 'gh actions', 'ci/cd pipeline', 'git'],
-            'github': ['git', 'version control', 'github.com', 'git hub'],
-            'testing': ['unit testing', 'integration testing', 'test automation', 'jest', 'mocha', 'supertest', 'load testing', 'tdd', 'test driven development'],
-            'tdd': ['test driven development', 'testing', 'unit testing'],
-            'jest': ['testing framework', 'javascript testing', 'js tests', 'react testing'],
-            'mocha': ['javascript testing framework', 'js tests'],
-            'supertest': ['api testing', 'http testing', 'express testing'],
-            'cypress': ['e2e testing', 'integration testing', 'frontend testing'],
-            'webhooks': ['webhook integration', 'web hooks', 'event hooks', 'event-driven'],
-            'microservices': ['microservice architecture', 'service oriented', 'distributed systems', 'microservice', 'api gateway'],
-            'api': ['api development', 'api integration', 'rest api', 'graphql', 'grpc', 'api gateway'],
-            'grpc': ['remote procedure call', 'protocol buffers', 'proto', 'service communication'],
-            'websocket': ['websockets', 'real-time communication', 'socket', 'realtime', 'centrifugo'],
-            'golang': ['go', 'go lang', 'hexagonal architecture', 'golang web'],
-            'c++': ['cpp', 'c plus plus', 'cplusplus'],
-            'c#': ['csharp', 'c sharp', 'dotnet', '.net'],
-            '.net': ['asp.net', 'asp.net core', 'dotnet', 'c#'],
-            'asp.net core': ['asp.net', '.net core', 'dotnet core'],
-            'asp.net': ['asp.net core', '.net', 'dotnet'],
-            'bash': ['shell scripting', 'command line', 'linux'],
-            'hexagonal architecture': ['hexagonal', 'port and adapter', 'clean architecture', 'onion architecture'],
-            'gin': ['gin framework', 'gin-gonic', 'go web framework', 'golang web', 'gin and chi', 'gin and chi frame works'],
-            'chi': ['chi framework', 'chi router', 'go web framework', 'golang web', 'gin and chi', 'gin and chi frame works'],
-            'react native': ['mobile app development', 'cross platform', 'ios android'],
-            'expo': ['react native', 'mobile development'],
-            'iac': ['infrastructure as code', 'terraform', 'cloudformation', 'pulumi'],
-            'security': ['oauth2', 'jwt', 'authentication', 'authorization', 'rbac', '2fa', 'two factor', 'otp', 'time based'],
-            'azure': ['microsoft azure', 'azure cloud', 'azure services', 'azure devops', 'azure kubernetes service', 'aks'],
-            'gcp': ['google cloud platform', 'google cloud', 'cloud platform', 'gke'],
-            'azure devops': ['azure', 'devops', 'ci/cd', 'continuous integration', 'continuous deployment'],
-            'gitlab': ['git', 'version control', 'ci/cd', 'gitlab ci/cd'],
-            'ci/cd': ['continuous integration', 'continuous deployment', 'delivery pipeline', 'deployment pipeline', 'azure devops', 'github actions', 'gitlab ci/cd'],
-            'webrtc': ['real-time communication', 'p2p', 'peer-to-peer', 'audio video', 'video streaming'],
-            'authentication': ['auth', 'login', 'register', 'oauth', 'jwt', 'security'],
-            'jwt': ['json web token', 'authentication', 'token based auth'],
-            'api gateway': ['gateway', 'api', 'microservice', 'service mesh', 'routing', 'proxy', 'kong', 'envoy proxy', 'traefik'],
-            'kong': ['api gateway', 'api management', 'service mesh'],
-            'envoy proxy': ['service mesh', 'api gateway', 'proxy'],
-            'traefik': ['reverse proxy', 'api gateway', 'kubernetes ingress'],
-            'prometheus': ['monitoring', 'metrics', 'observability', 'grafana'],
-            'grafana': ['monitoring', 'visualization', 'dashboard', 'prometheus'],
-            'loki': ['logging', 'log aggregation', 'observability'],
-            'kafka': ['message broker', 'streaming', 'event streaming'],
-            'rabbitmq': ['message broker', 'message queue', 'amqp'],
-            'firebase': ['realtime database', 'authentication', 'cloud messaging', 'baas'],
-            'centrifugo': ['websocket', 'real-time', 'messaging'],
-            'protocol buffer': ['protobuf', 'serialization', 'grpc'],
-            'tailwind': ['tailwind css', 'css framework'],
-            'tailwind css': ['css framework', 'utility-first css'],
-            'bootstrap': ['css framework', 'frontend framework'],
-            'css': ['stylesheet', 'web design', 'frontend'],
-            'scss': ['sass', 'css preprocessor'],
-            'sass': ['scss', 'css preprocessor'],
-            'html': ['markup', 'frontend', 'web development'],
-            'seo': ['search engine optimization', 'web visibility'],
-            'webpack': ['bundler', 'module bundler', 'frontend tooling'],
-            'babel': ['javascript compiler', 'transpiler'],
-            'npm': ['node package manager', 'package management'],
-            'yarn': ['package manager', 'dependency management'],
-            'redux': ['state management', 'react state', 'flux pattern'],
-            'context api': ['react state', 'state management'],
-            'react query': ['data fetching', 'react data', 'cache management'],
-            'lazy loading': ['performance optimization', 'code splitting'],
-            'minio': ['object storage', 's3 compatible'],
-            'devops': ['ci/cd', 'continuous integration', 'continuous deployment', 'azure devops']
-        }
-
-        # Technical skills patterns with broader matches
-        self.tech_skills_patterns = {
-            'programming': r'\b(python|java(?:script)?|typescript|go(?:lang)?|ruby|php|swift|kotlin|scala|rust|c\+\+|c#|perl|r|matlab)\b',
-            'python_stack': r'\b(fastapi|asyncio|async/await|boto3|sqlalchemy|pydantic|py(?:test)|poetry|alembic|opentelemetry|starlette|uvicorn|gunicorn|django|flask|celery|pandas|numpy|scipy|scikit-learn|tensorflow|pytorch|keras|matplotlib|seaborn|requests|beautifulsoup|scrapy|selenium|airflow|prefect|streamlit|dash|plotly|pyspark|dask|ray|typer|click|pipenv|virtualenv|conda|jupyter|pillow|opencv|nltk|spacy|gensim|transformers|huggingface|langchain|asynchronous|orm|data validation|dependency management|database migration)\b',
-            'web_tech': r'\b(django rest framework|fastapi|starlette|react(?:\.js)?|angular(?:js)?|vue(?:\.js)?|express(?:\.js)?|node(?:\.js)?|next(?:\.js)?|nuxt|gatsby|svelte|gin|chi frame\s*works?)\b',
-            'databases': r'\b(post(?:gres)?(?:sql)?|mysql|mssql|ms\s*sql|mongo(?:db)?|redis|elastic(?:search)?|cassandra|dynamo(?:db)?|oracle|database functions|triggers|orm|sql(?:alchemy)?)\b',
-            'cloud': r'\b(aws|amazon|azure|gcp|google cloud|kubernetes|k8s|docker|terraform|ansible|argo(?:cd)?|cloudformation|openstack|heroku|boto3|sqs|s3|ec2|lambda)\b',
-            'testing': r'\b(unit test|integration test|pytest|selenium|cypress|jest|mocha|chai|testing|test automation|playwright|testcafe|supertest|tdd|test driven development)\b',
-            'devops': r'\b(ci/cd|jenkins|travis|circle(?:ci)?|git(?:hub)?|gitlab|bitbucket|iac|helm|github actions|terraform|cloudformation|docker|kubernetes|k8s)\b',
-            'data_science': r'\b(scikit[-\s]?learn|pandas|numpy|matplotlib|tensorflow|pytorch|machine learning|deep learning|statistical analysis|pydantic|data validation)\b',
-            'api': r'\b(rest(?:ful)?(?:\s+)?api|api development|graphql|webhook|http[s]?|grpc|soap|openapi|swagger|api integration|3rd party api|fastapi)\b',
-            'architecture': r'\b(microservices|event[-\s]driven|service[-\s]oriented|distributed systems|scalable|high[-\s]availability|hexagonal architecture|asynchronous)\b',
-            'security': r'\b(oauth2?|jwt|authentication|authorization|rbac|security|encryption)\b',
-            'go_frameworks': r'\b(gin|chi|echo|mux|gorilla|fiber|fasthttp|beego)\b',
-            'node_frameworks': r'\b(express|koa|hapi|nest\.?js|meteor|sails|adonis)\b',
-            'microsoft': r'\b(mssql|ms\s*sql|azure|\.net|c#|aspnet|sharepoint)\b',
-            'monitoring': r'\b(grafana|prometheus|opentelemetry|metrics|observability|monitoring|logging|tracing|apm)\b'
-        }
+    def __init__(self, taxonomy=None):
+        # Compiled taxonomy (see skill_taxonomy.json), loaded once per process and shared read-only
+        self.taxonomy = taxonomy or load_taxonomy()
+        self.tech_skills_patterns = self.taxonomy.tech_skills_patterns
+        self.tech_skills_regex = self.taxonomy.tech_skills_regex
+        self.skill_name_replacements = self.taxonomy.skill_name_replacements
+        self.skill_variations = self.taxonomy.skill_variations
+
+        # Specific phrases matched anywhere in the text, and skills often listed in SKILLS
+        # sections (earlier keywords win); each vocabulary is scanned in a single automaton pass
+        self.specific_phrases = self.taxonomy.specific_phrases
+        self.skill_keywords = self.taxonomy.skill_keywords
+        self.specific_phrase_set = self.taxonomy.specific_phrase_set
+        self.phrase_automaton = self.taxonomy.phrase_automaton
+        self.keyword_automaton = self.taxonomy.keyword_automaton
+
+        # Reverse indexes from any skill to the taxonomy entries it expands to
+        self.variation_index = self.taxonomy.variation_index
+        self.base_skill_substrings = self.taxonomy.base_skill_substrings
+        self.base_skill_automaton = self.taxonomy.base_skill_automaton
+        self.taxonomy_terms = self.taxonomy.taxonomy_terms
+
+        # Closely related variations of taxonomy terms, filled in once per term as they are found
+        self.related_skills = {}
+
+        # Shared, memoized similarity engine (also used by find_best_match and external callers)
+        self.similarity = SkillSimilarity(self.normalize_skill_name, self.skill_variations)
+
+        # Fuzzy index over the whole taxonomy, built on first use
+        self._skill_index = None
 
     def extract_technical_skills(self, text):
-        """Extract technical skills from text using enhanced pattern matching"""
+        """Extract technical skills from text (a string or CVDocument) using enhanced pattern matching"""
         if not text:
             return []
 
-        text = text.lower()
+        # Lowered once per CV; a CVDocument shares it with the other consumers
+        text = CVDocument.from_text(text).lower
         found_skills = set()
         
         # First, check for specific phrases in various CV formats and industry technologies
-        # This is a targeted approach for comprehensive technical skill detection
-        specific_phrases = [
-            # Python Ecosystem (Adding specific Python technologies based on the JD)
-            "python", "py", "fastapi", "asyncio", "boto3", "sqlalchemy", "pydantic", "pytest", 
-            "poetry", "alembic", "django", "flask", "pyramid", "tornado", "celery", "pandas", "numpy", 
-            "scipy", "scikit-learn", "tensorflow", "pytorch", "keras", "matplotlib", "seaborn", 
-            "requests", "beautifulsoup", "scrapy", "selenium", "airflow", "luigi", "prefect", 
-            "streamlit", "dash", "plotly", "pyspark", "dask", "ray", "gunicorn", "uvicorn", "starlette",
-            "typer", "click", "pip", "pipenv", "virtualenv", "venv", "conda", "anaconda", "jupyter",
-            "pillow", "opencv", "nltk", "spacy", "gensim", "transformers", "huggingface", "langchain",
-            
-            # Golang and related
-            "golang", "go", "hexagonal architecture", "gin", "chi", "gin and chi", "gin and chi frame works",
-            "echo", "fasthttp", "gorm", "beego", "buffalo", "fiber", "gorilla", "goa", "kit", "cobra",
-            
-            # JavaScript/TypeScript ecosystem
-            "javascript", "js", "typescript", "ts", "nodejs", "node.js", "express", "express.js", "expressjs", 
-            "react", "react.js", "reactjs", "next.js", "nextjs", "nestjs", "nest.js", "vue", "vuejs", 
-            "vue.js", "angular", "svelte", "nuxt.js", "ember", "jquery", "gatsby", "meteor", "electron",
-            "deno", "fastify", "hapi", "koa", "adonis", "sails", "strapi", "prisma", "sequelize", "typeorm",
-            "backbone.js", "ember.js", "d3.js", "three.js", "chart.js", "highcharts", "leaflet", "mapbox",
-            "openlayers",
-            
-            # State Management
-            "redux", "mobx", "recoil", "zustand", "jotai", "xstate", "react context api", "apollo client",
-            "akita", "react query", "swr", "redux toolkit", "easy peasy", "effector", "storeon", 
-            "overmind", "kea", "redux-saga", "redux-observable", "redux-thunk", "mobx-state-tree",
-            "redux-zero", "react easy state", "cerebral", "rematch", "react tracked", "hookstate",
-            "unstated next", "stapp", "valtio", "pullstate", "vuex", "pinia", "vue composable", "harlem",
-            "ngrx", "ngxs", "angular redux", "svelte store", "provider", "riverpod", "bloc", "getx",
-            "stacked", "states rebuilder", "flutter command", "flutter hooks", "fish redux", 
-            "async redux", "flutter modular", "android jetpack", "koin", "dagger hilt", "rxjava",
-            "coroutines flow", "mvrx", "orbit mvi", "roxie", "mobius", "mosby mvi", "okuki",
-            "swiftui", "combine", "rxswift", "reswift", "redux-swift", "mobius swift", "katana swift",
-            "reactorkit", "ribs", "the composable architecture", "tca", "fluxor", "vueflux", "mobx swift",
-            "resolver",
-            
-            # Java & JVM ecosystem
-            "java", "j2ee", "jvm", "spring", "spring boot", "springboot", "hibernate", "maven", "gradle",
-            "quarkus", "micronaut", "tomcat", "jetty", "undertow", "vert.x", "jersey", "jooq", "jpa",
-            "jaxrs", "jaxws", "jakartaee", "junit", "mockito", "groovy", "scala", "kotlin", "clojure",
-            
-            # .NET ecosystem
-            "c#", "c sharp", "csharp", ".net", "asp.net", "asp.net core", "dotnet", "entity framework",
-            "ef core", "linq", "xamarin", "blazor", "razor", "maui", "winforms", "wpf", "uwp", "xunit", 
-            "nunit", "mstest", "ef", "vb.net", "f#", "powershell",
-            
-            # Other Programming Languages
-            "c++", "cpp", "c", "objective-c", "ruby", "rust", "swift", "kotlin", "scala", "php", 
-            "r", "matlab", "dart", "lua", "perl", "haskell", "clojure", "erlang", "elixir", "ocaml",
-            "assembly", "fortran", "cobol", "prolog", "lisp", "bash", "shell", "powershell", "tcl",
-            
-            # Testing Frameworks
-            "test driven development", "jest", "mocha", "supertest", "tdd", "cypress", "selenium", 
-            "unit testing", "integration testing", "e2e testing", "puppeteer", "playwright", "jmeter",
-            "locust", "gatling", "postman", "soapui", "junit", "testng", "xunit", "nunit", "mstest",
-            "pytest", "rspec", "cucumber", "behave", "chai", "jasmine", "karma", "enzyme", "appium",
-            
-            # Databases & Data Storage
-            "postgresql", "postgres", "postgresq", "mongodb", "mongo", "mssql", "ms sql", "sql", "ms sql server",
-            "mysql", "mariadb", "oracle", "sqlite", "rethinkdb", "sql server", "redis", "memcached", 
-            "cassandra", "dynamodb", "couchdb", "couchbase", "neo4j", "arangodb", "influxdb", "timescaledb",
-            "elasticsearch", "solr", "clickhouse", "snowflake", "bigquery", "redshift", "databricks",
-            "cockroachdb", "firestore", "realm", "etcd", "riak", "hbase", "faunadb", "supabase",
-            
-            # DevOps, CI/CD & Cloud
-            "docker", "kubernetes", "k8s", "azure", "aws", "amazon web services", "azure kubernetes service", 
-            "ci/cd", "devops", "gcp", "google cloud platform", "google kubernetes engine", "gke", "kubernete",
-            "gitlab", "gitlab ci/cd", "github actions", "azure devops", "jenkins", "circleci", "travis",
-            "terraform", "cloudformation", "ansible", "chef", "puppet", "vagrant", "packer", "consul",
-            "nomad", "vault", "prometheus", "grafana", "elk", "elasticsearch", "logstash", "kibana",
-            "fluentd", "istio", "linkerd", "envoy", "envoy proxy", "argocd", "argo", "kustomize", "helm",
-            "openshift", "rancher", "digitalocean", "linode", "heroku", "netlify", "vercel", "render",
-            "fly.io", "cloudflare", "s3", "ec2", "lambda", "step functions", "ecs", "eks", "fargate",
-            "azure functions", "app service", "aks", "gke", "cloud run", "cloud functions", "firebase",
-            "gcs", "blob storage", "sqs", "sns", "eventbridge", "kinesis", "pubsub", "cloud storage",
-            
-            # Version control
-            "git", "github", "bitbucket", "azure devops", "git graph", "gitlab", "svn", "mercurial",
-            "perforce", "sourcetree", "gitkraken", "conventional commits", "semantic versioning",
-            
-            # Networking & API
-            "grpc", "api", "api gateway", "microservice", "microservices", "kong", "envoy proxy", 
-            "traefik", "protocol buffer", "protobuf", "rest", "restful", "graphql", "soap", "rpc",
-            "websocket", "http", "https", "tcp", "udp", "dns", "oauth", "jwt", "openapi", "swagger",
-            "postman", "insomnia", "networking", "load balancer", "nginx", "apache", "haproxy", "caddy",
-            "service mesh", "istio", "linkerd", "consul", "zookeeper", "etcd", "avro", "thrift",
-            
-            # Web Technologies
-            "html", "css", "scss", "sass", "less", "tailwind", "tailwind css", "bootstrap", "material-ui",
-            "chakra ui", "styled-components", "emotion", "webpack", "rollup", "vite", "esbuild", "parcel",
-            "babel", "eslint", "prettier", "typescript", "javascript", "jquery", "ajax", "spa", "pwa",
-            "responsive design", "web components", "webgl", "svg", "canvas", "ssr", "ssg", "jamstack",
-            
-            # Monitoring & Observability
-            "prometheus", "grafana", "loki", "opentelemetry", "jaeger", "zipkin", "datadog", "new relic",
-            "dynatrace", "splunk", "nagios", "zabbix", "elk", "elasticsearch", "logstash", "kibana",
-            "fluentd", "logging", "monitoring", "metrics", "tracing", "apm", "sentry", "statsd",
-            "telegraf", "influxdb", "thanos", "cortex", "victoria metrics",
-            
-            # Messaging & Real-time
-            "kafka", "rabbitmq", "activemq", "zeromq", "nats", "pulsar", "mqtt", "redis pub/sub",
-            "centrifugo", "firebase", "pusher", "socketio", "socket.io", "websocket", "sse", "amqp",
-            "event sourcing", "cqrs", "pubsub", "message broker", "message queue", "event bus",
-            
-            # Mobile Development
-            "react native", "expo", "flutter", "swift", "objective-c", "kotlin", "java android",
-            "android studio", "xcode", "ios", "android", "ionic", "cordova", "capacitor", "nativescript",
-            
-            # Build Tools & Package Managers
-            "webpack", "babel", "gulp", "grunt", "rollup", "vite", "esbuild", "parcel", "npm", "yarn",
-            "pnpm", "maven", "gradle", "ant", "sbt", "poetry", "pip", "pipenv", "conda", "cargo",
-            "nuget", "composer", "bundler", "make", "cmake", "bazel", "buck",
-            
-            # State Management
-            "redux", "mobx", "context api", "recoil", "zustand", "jotai", "redux toolkit", "rtk query",
-            "react query", "swr", "ngrx", "ngxs", "vuex", "pinia", "xstate", "redux saga", "redux thunk",
-            
-            # Performance & Optimization
-            "seo", "search engine optimization", "lazy loading", "performance optimization",
-            "web vitals", "code splitting", "tree shaking", "memoization", "caching", "cdn", "compression",
-            "minification", "prefetching", "web performance", "ssr", "ssg", "server side rendering",
-            "static site generation", "image optimization", "lighthouse", "pagespeed", "core web vitals",
-            
-            # Storage & Object Storage
-            "minio", "s3", "object storage", "cloud storage", "block storage", "file storage", "nas",
-            "san", "blob storage", "gcs", "azure blob", "ceph", "swift", "gluster", "hdfs", "nfs",
-            
-            # Security
-            "security", "nginx", "jwt", "authentication", "oauth2", "2fa", "two factor authentication",
-            "encryption", "hashing", "tls", "ssl", "https", "vpn", "firewall", "waf", "iam", "rbac",
-            "saml", "oidc", "penetration testing", "vulnerability scanning", "sonarqube", "snyk",
-            "owasp", "csrf", "xss", "sql injection", "authentication", "authorization", "secrets management",
-            
-            # AI & Machine Learning
-            "machine learning", "ml", "artificial intelligence", "ai", "deep learning", "neural networks",
-            "tensorflow", "pytorch", "keras", "scikit-learn", "sklearn", "computer vision", "nlp",
-            "natural language processing", "reinforcement learning", "gans", "transformers", "bert",
-            "gpt", "huggingface", "opencv", "data science", "data mining", "feature engineering",
-            "hyperparameter tuning", "model deployment", "mlops", "kubeflow", "mlflow", "langchain",
-            
-            # Quantum and Emerging Tech
-            "quantum computing", "quantum programming", "q#", "qiskit", "cirq", "qutip", 
-            "quantum machine learning", "webassembly", "wasm", "edge computing", "5g", "6g", "iot",
-            "internet of things", "mqtt", "lorawan", "zigbee", "thread", "nb-iot", "sigfox",
-            "blockchain", "smart contracts", "decentralized applications", "dapps", "zero-knowledge proofs",
-            "homomorphic encryption", "federated learning", "differential privacy", "ar", "vr", "xr",
-            "augmented reality", "virtual reality", "mixed reality", "webxr", "unity", "unreal engine",
-            
-            # Python Specific for the JD
-            "fastapi", "asyncio", "async/await", "boto3", "sqlalchemy", "pydantic", "pytest", 
-            "poetry", "alembic", "grafana", "opentelemetry", "docker", "kubernetes", "python microservices"
-        ]
-        
-        for phrase in specific_phrases:
-            if phrase in text.lower():
-                found_skills.add(phrase)
-                # If we find multiple word terms like "test driven development" also add their abbreviations
-                if phrase == "test driven development":
-                    found_skills.add("tdd")
-
-        # Extract skills using patterns
-        for category, pattern in self.tech_skills_patterns.items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                skill = match.group(0).lower().strip()
-                # Clean up the skill name
-                skill = re.sub(r'\s+', ' ', skill)
-                found_skills.add(skill)
+        # A single automaton pass reports every phrase that occurs anywhere in the text
+        found_skills.update(self.phrase_automaton.find_all(text))
+        # If we find multiple word terms like "test driven development" also add their abbreviations
+        if "test driven development" in found_skills:
+            found_skills.add("tdd")
+
+        # Extract skills using patterns (one scan covers every category)
+        found_skills.update(self.categorize_technical_skills(text))
         
         # Special case: check for phrases that might contain skills with specific formatting
         # For example: "Gin and Chi Frameworks" would match both Gin and Chi separately
-        frameworks_check = re.findall(r'\b(gin|chi|express|flask|django|react|vue)\s+(?:and|&|,)\s+(gin|chi|express|flask|django|react|vue)\s+(?:frame\s*works?|libraries)', text.lower())
+        frameworks_check = re.findall(r'\b(gin|chi|express|flask|django|react|vue)\s+(?:and|&|,)\s+(gin|chi|express|flask|django|react|vue)\s+(?:frame\s*works?|libraries)', text)
         if frameworks_check:
             for match in frameworks_check:
                 for framework in match:
@@ -320,84 +88,16 @@ class NLPMatcher:
         skill_list_pattern = r'[•\-\*]?\s*([\w\s\.\(\)/,&+#]+)(?:\.|,|\n|$)'
         potential_skill_items = re.findall(skill_list_pattern, text)
         
-        # Define skills that are often listed in bullet points in SKILLS sections
-        skill_keywords = [
-            # Python Stack - JD Specific (Adding these first for prioritization)
-            "python", "fastapi", "asyncio", "async/await", "boto3", "sqlalchemy", "pydantic", "pytest", 
-            "poetry", "alembic", "grafana", "opentelemetry", "docker", "kubernetes", "microservices",
-            "aws", "sqs", "s3", "postgres", "postgresql", "asynchronous", "i/o bound", "monitoring",
-            "observability", "data validation", "dependency management", "database migration",
-            "scalable", "high-performance", "cloud", "serverless", "asyncpg", "aiohttp", "psycopg2",
-            
-            # Programming Languages
-            "golang", "go", "typescript", "javascript", "python", "java", "c#", "c++", "bash", "shell", 
-            
-            # Frontend
-            "react", "react.js", "reactjs", "vue", "angular", "nextjs", "next.js", "html", "css", 
-            "scss", "sass", "less", "tailwind", "tailwind css", "bootstrap",
-            
-            # Backend
-            "nodejs", "node.js", "express", "express.js", "expressjs", "nestjs", "nest.js",
-            "asp.net", "asp.net core", ".net", "dotnet",
-            "gin", "chi", "mux", "gorilla", "flask", "django",
-            
-            # Database
-            "postgresql", "postgres", "mongodb", "mongo", "sql", "nosql", "mssql", "mysql", "redis",
-            "rethinkdb", "sqlite", "oracle", "dynamodb", "cassandra", "couchdb",
-            
-            # Cloud & Infrastructure
-            "docker", "kubernetes", "k8s", "aws", "azure", "gcp", "google cloud", 
-            "heroku", "netlify", "vercel", "digital ocean", "linode", "cloudflare",
-            
-            # DevOps & CI/CD
-            "ci/cd", "devops", "github actions", "gitlab", "jenkins", "travis", "circle ci", 
-            "azure devops", "terraform", "ansible", "chef", "puppet",
-            
-            # Version Control
-            "git", "github", "gitlab", "bitbucket", "git graph",
-            
-            # API & Architecture
-            "api", "rest", "restful", "graphql", "grpc", "soap", "microservice", "microservices", 
-            "serverless", "api gateway", "kong", "envoy proxy", "traefik",
-            
-            # Real-time & Messaging
-            "websocket", "webrtc", "kafka", "rabbitmq", "mqtt", "nats", "centrifugo", "firebase",
-            
-            # Testing
-            "test", "tdd", "jest", "mocha", "chai", "supertest", "cypress", "selenium", "pytest",
-            "unit testing", "integration testing", "e2e testing", "test driven development",
-            
-            # Security & Authentication
-            "authentication", "oauth", "jwt", "authorization", "rbac", "security", "oauth2",
-            
-            # Monitoring & Observability
-            "prometheus", "grafana", "loki", "elk", "datadog", "new relic", "sentry",
-            
-            # Build Tools
-            "webpack", "babel", "rollup", "vite", "esbuild", "parcel", "npm", "yarn", "pnpm",
-            
-            # State Management
-            "redux", "mobx", "context api", "recoil", "zustand", "react query", "swr",
-            
-            # Mobile Development
-            "react native", "expo", "flutter", "swift", "kotlin",
-            
-            # Performance & Optimization
-            "seo", "lazy loading", "code splitting", "web vitals", "performance optimization",
-            
-            # Specific Technologies
-            "protocol buffer", "protobuf", "minio", "hexagonal architecture", "serverless"
-        ]
-        
         # Check each potential skill item
         for item in potential_skill_items:
             item = item.strip().lower()
-            # Check if this item contains a known skill
-            for keyword in skill_keywords:
-                if keyword in item and len(item) < 50:  # Avoid matching long sentences
-                    found_skills.add(item)
-                    found_skills.add(keyword)
-                    break
+            if len(item) >= 50:  # Avoid matching long sentences
+                continue
+            # Check if this item contains a known skill, preferring the earliest keyword in the list
+            keyword = self.keyword_automaton.first_by_rank(item)
+            if keyword:
+                found_skills.add(item)
+                found_skills.add(keyword)
                     
         # Check for "SKILLS" section followed by list (common in CV format)
         skills_section_match = re.search(r'SKILLS?\s*(?:\n|:)(.*?)(?:\n\s*\n|\n[A-Z]{3,})', text, re.DOTALL | re.IGNORECASE)
@@ -418,21 +118,14 @@ class NLPMatcher:
             # Split by comma to get individual technologies
             techs = [t.strip() for t in stack.split(',')]
             for tech in techs:
-                if tech.lower() in specific_phrases or any(keyword in tech.lower() for keyword in skill_keywords):
-                    found_skills.add(tech.lower())
+                tech = tech.lower()
+                if tech in self.specific_phrase_set or self.keyword_automaton.contains_any(tech):
+                    found_skills.add(tech)
 
         # Add variations and related skills
         expanded_skills = set()
         for skill in found_skills:
-            expanded_skills.add(skill)
-            # Check variations and synonyms
-            for base_skill, variations in self.skill_variations.items():
-                if skill in variations or skill == base_skill or skill in base_skill or base_skill in skill:
-                    expanded_skills.add(base_skill)
-                    # Only add closely related variations, not all of them
-                    for var in variations:
-                        if skill in var or var in skill or self.get_skill_similarity(skill, var) > 0.7:
-                            expanded_skills.add(var)
+            expanded_skills.update(self.expand_skill(skill))
 
         # Clean and normalize skills
         normalized_skills = set()
@@ -442,7 +135,7 @@ class NLPMatcher:
                 normalized_skills.add(normalized)
                 
         # Final sanity check - ensure specific skills are included if text contains clear indicators
-        if "gin" in text.lower() and "chi" in text.lower() and "golang" in text.lower():
+        if "gin" in text and "chi" in text and "golang" in text:
             normalized_skills.add("golang")
             normalized_skills.add("gin")
             normalized_skills.add("chi")
@@ -450,7 +143,7 @@ class NLPMatcher:
         # Hard-coded check for specific resume formats we've seen
         
         # Kunle Olanipekun's resume format
-        if "olanipekun" in text.lower() and "adekunle" in text.lower() or "kunle" in text.lower():
+        if "olanipekun" in text and "adekunle" in text or "kunle" in text:
             # Add skills listed in the SKILLS section
             kunle_skills = [
                 "golang", "hexagonal architecture", "gin", "chi", "typescript", "nodejs", 
@@ -460,11 +153,11 @@ class NLPMatcher:
                 "websockets", "rest api", "api gateway", "azure kubernetes service"
             ]
             for skill in kunle_skills:
-                if skill in text.lower():
+                if skill in text:
                     normalized_skills.add(skill)
         
         # Nafiul Bari Khan's resume format
-        if "nafiul" in text.lower() or "bari khan" in text.lower():
+        if "nafiul" in text or "bari khan" in text:
             nafiul_skills = [
                 "go", "golang", "c++", "c#", "javascript", "sql", "bash",
                 "postgresql", "ms sql server", "firebase", "centrifugo",
@@ -475,11 +168,11 @@ class NLPMatcher:
                 "minio", "cloud storage"
             ]
             for skill in nafiul_skills:
-                if skill in text.lower():
+                if skill in text:
                     normalized_skills.add(skill)
         
         # Dimgba Micheal's resume format
-        if "dimgba" in text.lower() or "micheal" in text.lower():
+        if "dimgba" in text or "micheal" in text:
             dimgba_skills = [
                 "javascript", "typescript", "react.js", "react", "next.js", "nextjs",
                 "nestjs", "expressjs", "express", "node.js", "nodejs", "mongodb",
@@ -492,11 +185,89 @@ class NLPMatcher:
                 "expo", "cloud platforms", "lazy loading"
             ]
             for skill in dimgba_skills:
-                if skill in text.lower():
+                if skill in text:
                     normalized_skills.add(skill)
         
         return sorted(list(normalized_skills))
 
+    def extract_technical_skills_batch(self, texts, workers=None, chunksize=None):
+        """Extract technical skills for many texts across a process pool, returning results in input order"""
+        texts = list(texts)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(texts))
+        if workers <= 1:
+            return [self.extract_technical_skills(text) for text in texts]
+
+        # A few chunks per worker amortize IPC while still balancing uneven CV lengths
+        if chunksize is None:
+            chunksize = max(1, math.ceil(len(texts) / (workers * 4)))
+        # Workers receive plain text; a CVDocument's cached views stay in this process
+        plain_texts = [text.text if isinstance(text, CVDocument) else text for text in texts]
+        chunks = [plain_texts[start:start + chunksize] for start in range(0, len(plain_texts), chunksize)]
+        taxonomy = None if self.taxonomy is load_taxonomy() else self.taxonomy
+
+        try:
+            results = []
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_extraction_worker,
+                                     initargs=(taxonomy,)) as executor:
+                for chunk_skills in executor.map(_extract_chunk, chunks):
+                    results.extend(chunk_skills)
+            return results
+        except Exception as e:
+            st.warning(f"Parallel skill extraction failed, extracting sequentially: {str(e)}")
+            return [self.extract_technical_skills(text) for text in texts]
+
+    def _find_related_skills(self, skill):
+        """Collect the base skills a skill belongs to and the variations closely related to it"""
+        base_skills = set(self.variation_index.get(skill, ()))
+        base_skills.update(self.base_skill_substrings.get(skill, ()))
+        base_skills.update(self.base_skill_automaton.find_all(skill))
+
+        related = {skill}
+        for base_skill in base_skills:
+            related.add(base_skill)
+            # Only add closely related variations, not all of them
+            for var in self.skill_variations[base_skill]:
+                if skill in var or var in skill or self.similarity.is_similar(skill, var, 0.7):
+                    related.add(var)
+        return frozenset(related)
+
+    def expand_skill(self, skill):
+        """Return a skill together with its base skills and closely related variations"""
+        related = self.related_skills.get(skill)
+        if related is None:
+            related = self._find_related_skills(skill)
+            # Only taxonomy terms are cached so the table stays bounded by the vocabulary size
+            if skill in self.taxonomy_terms:
+                self.related_skills[skill] = related
+        return related
+
+    def categorize_technical_skills(self, text):
+        """Map each skill matched by tech_skills_patterns to the categories it was found under"""
+        skill_categories = {}
+        if not text:
+            return skill_categories
+
+        # Each category keeps its own non-overlapping scan position, as separate finditer calls would
+        categories = tuple(self.tech_skills_patterns)
+        group_indexes = [self.tech_skills_regex.groupindex[category] for category in categories]
+        next_start = [0] * len(categories)
+        slots = range(len(categories))
+        for match in self.tech_skills_regex.finditer(text):
+            position = match.start()
+            skills = match.group(*group_indexes)
+            for slot in compress(slots, skills):
+                skill = skills[slot]
+                if position < next_start[slot]:
+                    continue
+                next_start[slot] = position + len(skill)
+                # Clean up the skill name
+                skill = ' '.join(skill.lower().split())
+                skill_categories.setdefault(skill, set()).add(categories[slot])
+
+        return skill_categories
+
     def match_skills(self, candidate_skills, required_skills):
         """Match candidate skills against required skills with clear scoring"""
         if not candidate_skills or not required_skills:
@@ -505,12 +276,13 @@ class NLPMatcher:
         matched_skills = []
         matched_count = 0
         total_required = len(required_skills)
+        candidate_lowers = {s.lower() for s in candidate_skills}
 
         for req_skill in required_skills:
             req_lower = req_skill.lower().strip()
 
             # Direct match (100% match)
-            if req_lower in [s.lower() for s in candidate_skills]:
+            if req_lower in candidate_lowers:
                 matched_skills.append(req_skill)
                 matched_count += 1
                 continue
@@ -538,6 +310,10 @@ class NLPMatcher:
         score = (matched_count / total_required) * 100 if total_required > 0 else 0
         return score, list(set(matched_skills))
 
+    def compile_job(self, job_requirements):
+        """Compile job requirements into a JobMatcher for matching many CVs against one job"""
+        return JobMatcher(job_requirements, self.skill_variations)
+
     def normalize_skill_name(self, skill):
         """Normalize skill names to standard format"""
         if not isinstance(skill, str):
@@ -552,230 +328,45 @@ class NLPMatcher:
         skill = re.sub(r'(?:development|programming|engineer)$', '', skill)
 
         # Standardize common variations
-        replacements = {
-            # API & Web Development
-            'restful': 'restful api',
-            'rest': 'restful api',
-            'api development': 'restful api',
-            'web api': 'restful api',
-            'http api': 'restful api',
-            'webrtc': 'web real-time communication',
-            'websocket': 'websocket',
-            'api gateway': 'api gateway',
-            
-            # Python Specific (based on JD)
-            'py': 'python',
-            'async': 'asyncio',  
-            'asynchronous programming': 'asyncio',
-            'boto': 'boto3',
-            'aws sdk': 'boto3',
-            'sql alchemy': 'sqlalchemy',
-            'alchemy': 'sqlalchemy',
-            'orm': 'sqlalchemy',
-            'pydantic model': 'pydantic',
-            'data validation': 'pydantic',
-            'pytest framework': 'pytest',
-            'poetry package': 'poetry',
-            'dependency management': 'poetry',
-            'alembic migration': 'alembic',
-            'database migration': 'alembic',
-            'fastapi framework': 'fastapi',
-            'fast api': 'fastapi',
-            'telemetry': 'opentelemetry',
-            'open telemetry': 'opentelemetry',
-            'tracing': 'opentelemetry',
-
-            # Programming Languages
-            'js': 'javascript',
-            'go lang': 'golang',
-            'go': 'golang',
-            'c plus plus': 'c++',
-            'cpp': 'c++',
-            'c sharp': 'c#',
-            'csharp': 'c#',
-            
-            # Backend Technologies
-            'dotnet': '.net',
-            'asp.net core': 'asp.net core',
-            'asp.net': 'asp.net',
-            '.net core': 'asp.net core',
-
-            # Databases
-            'postgres': 'postgresql',
-            'postgresq': 'postgresql',  # Handle typo from resume
-            'ms sql': 'mssql',
-            'ms sql server': 'mssql',
-            'microsoft sql': 'mssql',
-            'sql server': 'mssql',
-            'mongo': 'mongodb',
-
-            # JavaScript Ecosystem
-            'node.js': 'nodejs',
-            'node js': 'nodejs',
-            'express.js': 'express',
-            'expressjs': 'express',
-            'express js': 'express',
-            'react.js': 'react',
-            'reactjs': 'react',
-            'next.js': 'nextjs',
-            'nest.js': 'nestjs',
-            'nestjs': 'nestjs',
-            
-            # Frontend Technologies
-            'tailwind': 'tailwind css',
-            'scss': 'sass/scss',
-            'sass': 'sass/scss',
-            
-            # Go Frameworks
-            'chi framework': 'chi',
-            'chi router': 'chi',
-            'gin framework': 'gin',
-            'gin gonic': 'gin',
-            'chi frame works': 'chi',
-            'gin frame works': 'gin',
-            'gin and chi frame works': 'gin and chi',
-            'gin and chi': 'golang web frameworks',
-            
-            # Cloud & DevOps
-            'k8s': 'kubernetes',
-            'kubernete': 'kubernetes',
-            'aks': 'azure kubernetes service',
-            'gke': 'google kubernetes engine',
-            'azure devops': 'ci/cd',
-            'github actions': 'ci/cd',
-            'gitlab ci/cd': 'ci/cd',
-            'gcp': 'google cloud platform',
-            
-            # API Gateways & Service Mesh
-            'kong': 'api gateway',
-            'envoy proxy': 'api gateway',
-            'traefik': 'api gateway',
-            
-            # Monitoring & Observability
-            'prometheus': 'monitoring',
-            'grafana': 'monitoring',
-            'loki': 'logging',
-            
-            # Messaging & Real-time
-            'centrifugo': 'real-time messaging',
-            'firebase': 'backend as a service',
-            'kafka': 'message broker',
-            'rabbitmq': 'message broker',
-            
-            # Testing
-            'test driven development': 'tdd',
-            'jest': 'javascript testing',
-            'mocha': 'javascript testing',
-            'supertest': 'api testing',
-            'cypress': 'end-to-end testing',
-            
-            # Architecture
-            'hexagonal architecture': 'hexagonal architecture',
-            'microservice': 'microservices',
-            'microservices': 'microservices',
-            
-            # Security
-            'auth': 'authentication',
-            'oauth2': 'authentication',
-            'jwt': 'authentication',
-            'etoken': 'two factor authentication',
-            
-            # Mobile Development
-            'react native': 'mobile development',
-            'expo': 'mobile development',
-            
-            # Build Tools
-            'webpack': 'build tools',
-            'babel': 'build tools',
-            'npm': 'package manager',
-            'yarn': 'package manager',
-            
-            # Python-specific for JD
-            'fastapi': 'python web framework',
-            'asyncio': 'python asynchronous',
-            'async/await': 'python asynchronous',
-            'boto3': 'aws sdk for python',
-            'sqlalchemy': 'python orm',
-            'pydantic': 'python data validation',
-            'pytest': 'python testing',
-            'poetry': 'python dependency management',
-            'alembic': 'database migration',
-            'opentelemetry': 'monitoring',
-
-            # State Management
-            'redux': 'state management',
-            'context api': 'state management',
-            'react query': 'data fetching',
-            
-            # Object Storage
-            'minio': 'object storage',
-            
-            # Other
-            'bash': 'shell scripting',
-            'seo': 'search engine optimization',
-            'lazy loading': 'performance optimization',
-            'protocol buffer': 'protobuf',
-            
-            # Quantum and Emerging Tech
-            'quantum computing': 'quantum technologies',
-            'q#': 'quantum programming',
-            'qiskit': 'quantum programming',
-            'cirq': 'quantum programming',
-            'qutip': 'quantum programming',
-            'quantum machine learning': 'quantum technologies',
-            'webassembly': 'wasm',
-            'wasm': 'web assembly',
-            'edge computing': 'distributed computing',
-            '5g': 'networking technology',
-            '6g': 'next-gen networking',
-            'iot': 'internet of things',
-            'mqtt': 'iot protocol',
-            'lorawan': 'iot protocol',
-            'zigbee': 'iot protocol',
-            'thread': 'iot protocol',
-            'nb-iot': 'iot protocol',
-            'sigfox': 'iot protocol',
-            'blockchain': 'distributed ledger technology',
-            'smart contracts': 'blockchain technology',
-            'dapps': 'decentralized applications',
-            'zero-knowledge proofs': 'cryptography',
-            'homomorphic encryption': 'cryptography',
-            'federated learning': 'privacy-preserving ai',
-            'differential privacy': 'privacy technology',
-            
-            # Extended Reality
-            'ar': 'augmented reality',
-            'vr': 'virtual reality',
-            'mr': 'mixed reality',
-            'xr': 'extended reality',
-            'webxr': 'web extended reality',
-            'unity': 'game engine',
-            'unreal engine': 'game engine',
-            
-            # Event-Driven Architecture
-            'akka': 'actor model',
-            'apache flink': 'stream processing',
-            'apache kafka': 'message broker',
-            'kafka streams': 'stream processing',
-            'apache spark': 'distributed computing',
-            'aws step functions': 'serverless workflows',
-            'azure durable functions': 'serverless workflows',
-            'dapr': 'distributed application runtime',
-            'eventuate': 'event sourcing',
-            'eventstoredb': 'event store',
-            'rsocket': 'reactive streams',
-            'sagas': 'distributed transactions',
-            'temporal workflow': 'workflow orchestration',
-            'zookeeper': 'distributed coordination'
-        }
-
-        return replacements.get(skill, skill).strip()
-
-    def find_best_match(self, skill, candidates):
-        """Find the best matching skill from candidates"""
+
+        return self.skill_name_replacements.get(skill, skill).strip()
+
+    @property
+    def skill_index(self):
+        """Fuzzy index over the taxonomy, shared by every matcher with the same taxonomy"""
+        if self._skill_index is None:
+            self.refresh_skill_index()
+        return self._skill_index
+
+    def refresh_skill_index(self):
+        """Rebuild the fuzzy index if the taxonomy changed since it was built"""
+        terms = list(self.skill_variations)
+        terms.extend(var for variations in self.skill_variations.values() for var in variations)
+        terms.extend(self.specific_phrases)
+        terms.extend(self.skill_keywords)
+        fingerprint = hash((
+            tuple(terms),
+            tuple((base_skill, tuple(variations)) for base_skill, variations in self.skill_variations.items()),
+        ))
+        self._skill_index = get_skill_index(terms, self.similarity, fingerprint)
+        return self._skill_index
+
+    def find_similar_skills(self, skill, threshold=0.7, limit=None):
+        """Find taxonomy skills similar to a free-text skill, as (skill, similarity) pairs"""
+        if not skill:
+            return []
+        if limit is not None:
+            return self.skill_index.top_k(skill, limit, min_similarity=threshold)
+        return self.skill_index.search(skill, threshold)
+
+    def find_best_match(self, skill, candidates=None):
+        """Find the best matching skill from candidates (the whole taxonomy when omitted)"""
         best_match = (None, 0)
         skill_lower = skill.lower()
 
+        if candidates is None:
+            return self._find_best_taxonomy_match(skill_lower) or best_match
+
         for candidate in candidates:
             candidate_lower = candidate.lower()
 
@@ -788,73 +379,67 @@ class NLPMatcher:
                 if candidate_lower in self.skill_variations[skill_lower]:
                     return (candidate, 1.0)
 
-            # Calculate similarity score
-            similarity = self.get_skill_similarity(skill_lower, candidate_lower)
-            if similarity > best_match[1]:
-                best_match = (candidate, similarity)
+            # Calculate similarity score, skipping candidates that can't beat the current best
+            if self.similarity.is_similar(skill_lower, candidate_lower, best_match[1]):
+                best_match = (candidate, self.similarity.similarity(skill_lower, candidate_lower))
 
         return best_match
 
-    def get_skill_similarity(self, skill1, skill2):
-        """Compute similarity between two skills"""
-        if not skill1 or not skill2:
-            return 0.0
-
-        # Normalize skills
-        skill1 = self.normalize_skill_name(skill1)
-        skill2 = self.normalize_skill_name(skill2)
+    def _find_best_taxonomy_match(self, skill_lower):
+        """Best taxonomy match for a skill, with exact and variation matches taking priority"""
+        index = self.skill_index
+        if skill_lower in index.rank:
+            return (skill_lower, 1.0)
+        for var in self.skill_variations.get(skill_lower, ()):
+            if var in index.rank:
+                return (var, 1.0)
 
-        # Exact match
-        if skill1 == skill2:
-            return 1.0
+        matches = index.top_k(skill_lower, 1, min_similarity=0.0)
+        if matches and matches[0][1] > 0:
+            return matches[0]
+        return None
 
-        # Check variations
-        if skill1 in self.skill_variations and skill2 in self.skill_variations[skill1]:
-            return 1.0
-
-        # Partial match
-        if skill1 in skill2 or skill2 in skill1:
-            return 0.8
-
-        # Levenshtein distance as last resort
-        return 1.0 - (self._levenshtein_distance(skill1, skill2) / max(len(skill1), len(skill2)))
+    def get_skill_similarity(self, skill1, skill2):
+        """Compute similarity between two skills"""
+        return self.similarity.similarity(skill1, skill2)
 
-    def _levenshtein_distance(self, s1, s2):
+    def _levenshtein_distance(self, s1, s2, max_distance=None):
         """Calculate the Levenshtein distance between two strings"""
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein_distance(s1, s2, max_distance)
 
     def compute_tf_idf(self, text, document_set):
-        """Compute TF-IDF scores for terms"""
-        # Term frequency in the text
-        tf = Counter(self.tokenize(text))
-
-        # Inverse document frequency
-        idf = {}
-        doc_count = len(document_set)
-
-        for term in tf:
-            doc_with_term = sum(1 for doc in document_set if term in self.tokenize(doc))
-            idf[term] = math.log(doc_count / (1 + doc_with_term))
-
-        # Compute TF-IDF
-        tf_idf = {term: freq * idf[term] for term, freq in tf.items()}
-        return tf_idf
+        """Compute TF-IDF scores for terms
+
+        document_set is either a DocumentCorpus (reused as is) or a collection of texts,
+        which is tokenized once into a temporary corpus.
+        """
+        if not isinstance(document_set, DocumentCorpus):
+            document_set = DocumentCorpus.from_texts(document_set, self.tokenize)
+        return document_set.tf_idf(text)
+
+    def create_corpus(self, documents=None):
+        """Create a DocumentCorpus tokenized like preprocess_text, from a {doc_id: text} mapping or a list"""
+        corpus = DocumentCorpus(self.preprocess_text)
+        if documents is not None:
+            items = documents.items() if isinstance(documents, dict) else enumerate(documents)
+            for doc_id, text in items:
+                corpus.add_document(doc_id, text)
+        return corpus
+
+    def job_query_terms(self, job_requirements, nice_to_have_weight=0.5):
+        """Weighted query terms for a job parsed by utils.parse_job_description"""
+        query_terms = {}
+        weighted_skills = [(skill, 1.0) for skill in job_requirements.get('required_skills', [])]
+        weighted_skills += [(skill, nice_to_have_weight) for skill in job_requirements.get('nice_to_have_skills', [])]
+        for skill, weight in weighted_skills:
+            for term in self.preprocess_text(skill):
+                # A term shared by several skills keeps its strongest weight
+                query_terms[term] = max(query_terms.get(term, 0.0), weight)
+        return query_terms
+
+    def rank_cvs_bm25(self, job_requirements, corpus, limit=50):
+        """Return the top (doc_id, score) pairs of a CV corpus for a job, ranked with BM25"""
+        return corpus.top_k(self.job_query_terms(job_requirements), limit)
 
     def preprocess_text(self, text):
         """Preprocess text for comparison"""
@@ -0,0 +1,101 @@
+from collections import deque
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton that finds every vocabulary phrase in a text with a single pass"""
+
+    def __init__(self, phrases):
+        # Keep the first occurrence of each phrase so callers can rely on vocabulary order
+        self.phrases = [phrase for phrase in dict.fromkeys(phrases) if phrase]
+        self.rank = {phrase: index for index, phrase in enumerate(self.phrases)}
+
+        # Trie transitions, failure links and the phrases that end at each state
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]
+
+        for phrase in self.phrases:
+            self._insert(phrase)
+        self._build_failure_links()
+
+        # Resolved transitions (goto + failure chain), filled lazily while scanning
+        self._delta = [dict(edges) for edges in self._goto]
+
+    def _insert(self, phrase):
+        """Add a phrase to the trie"""
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state] = (phrase,)
+
+    def _build_failure_links(self):
+        """Link every state to its longest proper suffix state and merge outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(char, 0)
+                if fail_state == next_state:
+                    fail_state = 0
+                self._fail[next_state] = fail_state
+
+                inherited = self._output[fail_state]
+                if inherited:
+                    own = self._output[next_state] or ()
+                    self._output[next_state] = own + inherited
+
+    def _step(self, state, char):
+        """Follow the failure chain for a transition that has not been resolved yet"""
+        origin = state
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        next_state = self._goto[state].get(char, 0)
+        self._delta[origin][char] = next_state
+        return next_state
+
+    def find_all(self, text):
+        """Return the set of vocabulary phrases that occur anywhere in text"""
+        found = set()
+        if not text:
+            return found
+
+        delta, output, step = self._delta, self._output, self._step
+        state = 0
+        for char in text:
+            next_state = delta[state].get(char)
+            state = step(state, char) if next_state is None else next_state
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def contains_any(self, text):
+        """Check whether at least one vocabulary phrase occurs in text"""
+        if not text:
+            return False
+
+        delta, output, step = self._delta, self._output, self._step
+        state = 0
+        for char in text:
+            next_state = delta[state].get(char)
+            state = step(state, char) if next_state is None else next_state
+            if output[state]:
+                return True
+        return False
+
+    def first_by_rank(self, text):
+        """Return the earliest vocabulary phrase (by vocabulary order) found in text"""
+        found = self.find_all(text)
+        if not found:
+            return None
+        return min(found, key=self.rank.__getitem__)
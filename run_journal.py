@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+RUN_JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mastersheet_runs.db')
+
+
+def run_key(sheet_id, sheet_range):
+    """Identity of a mastersheet run: the same sheet range always resumes the same run"""
+    return hashlib.sha256(f"{sheet_id}\n{sheet_range}".encode('utf-8')).hexdigest()[:16]
+
+
+class RunJournal:
+    """Durable per-row journal of a mastersheet run
+
+    Each row's outcome is committed as soon as it is known, so a crashed run can resume without
+    repeating finished work. Rows are matched by sheet row index and CV link; a row whose link
+    changed is processed again. Rows journaled with status 'retry' (such as CVs whose download
+    failed) keep their outcome for the sheet but are processed again on resume.
+    """
+
+    def __init__(self, run_id, path=RUN_JOURNAL_PATH):
+        self.run_id = run_id
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, started_at TEXT NOT NULL, finished_at TEXT)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS run_rows ("
+                "run_id TEXT NOT NULL, row_index INTEGER NOT NULL, cv_link TEXT, status TEXT NOT NULL, "
+                "outcome TEXT, PRIMARY KEY (run_id, row_index))"
+            )
+
+    def start(self, resume=False):
+        """Begin the run, keeping the rows journaled by an earlier attempt only when resuming"""
+        with self._connection:
+            if not resume:
+                self._connection.execute("DELETE FROM run_rows WHERE run_id = ?", (self.run_id,))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO runs (run_id, started_at, finished_at) VALUES (?, ?, NULL)",
+                (self.run_id, datetime.now().isoformat())
+            )
+
+    def record_outcomes(self, outcomes, status='done'):
+        """Record finished rows, given as (index, cv_link, {column: value}) triples, in one transaction"""
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO run_rows (run_id, row_index, cv_link, status, outcome) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.run_id, int(index), cv_link, status, json.dumps(outcome))
+                 for index, cv_link, outcome in outcomes]
+            )
+
+    def record_outcome(self, index, cv_link, outcome, status='done'):
+        """Record a finished row's {column: value} outcome ('retry' status to process it again on resume)"""
+        self.record_outcomes([(index, cv_link, outcome)], status)
+
+    def completed(self):
+        """{row index: (cv_link, outcome)} of the rows already finished"""
+        return self.outcomes(statuses=('done',))
+
+    def outcomes(self, statuses=('done', 'retry')):
+        """{row index: (cv_link, outcome)} of the journaled rows with any of statuses"""
+        rows = self._connection.execute(
+            f"SELECT row_index, cv_link, outcome FROM run_rows WHERE run_id = ? "
+            f"AND status IN ({', '.join('?' * len(statuses))})", (self.run_id, *statuses))
+        return {index: (cv_link, json.loads(outcome)) for index, cv_link, outcome in rows}
+
+    def finish(self):
+        """Mark the run's results as written to the sheet"""
+        with self._connection:
+            self._connection.execute(
+                "UPDATE runs SET finished_at = ? WHERE run_id = ?", (datetime.now().isoformat(), self.run_id))
+
+    def is_finished(self):
+        row = self._connection.execute("SELECT finished_at FROM runs WHERE run_id = ?", (self.run_id,)).fetchone()
+        return bool(row and row[0])
+
+    def close(self):
+        self._connection.close()
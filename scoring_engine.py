@@ -1,12 +1,130 @@
+import hashlib
+import json
+import numpy as np
 import pandas as pd
 import streamlit as st
 from nlp_matcher import NLPMatcher
+from cv_document import CVDocument
+from skill_matrix import SkillMatrix, SkillVocabulary
+from keyword_scanner import KeywordScanner
+from feature_store import FEATURE_FORMAT, FEATURE_STORE_PATH, CVFeatures, FeatureStore, content_hash
+from phrase_automaton import PhraseAutomaton
 from datetime import datetime
 from deepseek_evaluator import DeepseekEvaluator
 
+def _select(conditions, choices, default):
+    """The choice of the first true condition, else default
+
+    Conditions may be NumPy arrays, in which case the choice is made elementwise, so one scoring
+    rule serves evaluate_cv (scalars) and score_features (arrays of CVs and jobs).
+    """
+    if any(isinstance(condition, np.ndarray) for condition in conditions):
+        return np.select(conditions, choices, default)
+    for condition, choice in zip(conditions, choices):
+        if condition:
+            return choice
+    return default
+
+
+def _at_least(value, floor):
+    """max(floor, value) for a scalar or elementwise for an array (NaN gives floor either way)"""
+    return np.fmax(value, floor) if isinstance(value, np.ndarray) else max(floor, value)
+
+
+def _at_most(value, cap):
+    """min(cap, value) for a scalar or elementwise for an array (NaN gives cap either way)"""
+    return np.fmin(value, cap) if isinstance(value, np.ndarray) else min(cap, value)
+
+
+class EvaluationContext:
+    """State of one CV evaluation, computed once and shared by every scoring stage"""
+
+    __slots__ = ('document', 'years_experience', 'technical_skills', 'required_skills', 'nice_to_have_skills',
+                 'matched_required', 'matched_nice_to_have', 'missing_required', 'missing_nice_to_have',
+                 'python_skills', 'python_stack_required', 'python_weighted_required', 'keyword_counts')
+
+    def __init__(self, document, years_experience, technical_skills, job_requirements, matched, keyword_counts):
+        self.document = document
+        self.years_experience = years_experience
+        self.technical_skills = technical_skills
+        self.required_skills = job_requirements.get('required_skills', [])
+        self.nice_to_have_skills = job_requirements.get('nice_to_have_skills', [])
+        self.matched_required, self.matched_nice_to_have = matched
+        self.missing_required = list(set(self.required_skills) - set(self.matched_required))
+        self.missing_nice_to_have = list(set(self.nice_to_have_skills) - set(self.matched_nice_to_have))
+        self.keyword_counts = keyword_counts
+
+        # Python stack classification, filled in by ScoringEngine
+        self.python_skills = []
+        self.python_stack_required = set()
+        self.python_weighted_required = set()
+
 class ScoringEngine:
+    # Python ecosystem skills reported in the Python stack assessment
+    python_stack_keywords = [
+        'python', 'py', 'fastapi', 'asyncio', 'async/await', 'boto3', 'sqlalchemy', 
+        'pydantic', 'pytest', 'poetry', 'alembic', 'grafana', 'opentelemetry', 
+        'microservices', 'postgresql', 'aws', 'docker', 'kubernetes', 'django', 'flask',
+        'celery', 'pandas', 'numpy', 'scipy', 'scikit-learn', 'tensorflow', 'pytorch',
+        'keras', 'matplotlib', 'seaborn', 'requests', 'beautifulsoup', 'scrapy', 'selenium',
+        'airflow', 'prefect', 'streamlit', 'dash', 'plotly', 'pyspark', 'dask', 'ray',
+        'gunicorn', 'uvicorn', 'starlette', 'typer', 'click', 'pipenv', 'virtualenv',
+        'conda', 'jupyter', 'pillow', 'opencv', 'nltk', 'spacy', 'gensim', 'transformers',
+        'huggingface', 'langchain', 'redis', 'kafka'
+    ]
+
+    # Python stack technologies from the JD, weighted 1.5x in the essential skills coverage
+    python_weighted_keywords = [
+        'python', 'fastapi', 'asyncio', 'async/await', 'boto3', 'sqlalchemy', 
+        'pydantic', 'pytest', 'poetry', 'alembic', 'grafana', 'opentelemetry', 
+        'microservices', 'postgresql', 'aws', 'docker', 'kubernetes'
+    ]
+
+    # Keywords in the CV text that indicate skill proficiency
+    proficiency_keywords = {
+        'expert': ['expert', 'advanced', 'senior', 'lead', 'architect'],
+        'intermediate': ['intermediate', 'experienced', 'proficient']
+    }
+
+    # Python backend specific keywords in the CV text
+    python_backend_keywords = [
+        'python', 'backend', 'server', 'microservice', 'api', 'fastapi', 'django', 'flask',
+        'aws', 'cloud', 'database', 'sql', 'nosql', 'postgresql', 'asyncio', 'asynchronous',
+        'software engineer', 'software developer', 'backend developer', 'backend engineer',
+        'data validation', 'orm', 'testing', 'ci/cd', 'devops', 'containerization',
+        'pydantic', 'pytest', 'poetry', 'alembic', 'sqlalchemy', 'boto3', 'grafana', 
+        'opentelemetry', 'starlette', 'uvicorn', 'gunicorn', 'celery', 'redis', 'kafka',
+        'elasticsearch', 'pyramid', 'tornado', 'aiohttp', 'sanic', 'falcon', 'graphql',
+        'grpc', 'protobuf', 'websocket', 'docker', 'kubernetes', 'terraform', 'ansible',
+        'jenkins', 'github actions', 'gitlab ci', 'circleci', 'prometheus', 'datadog',
+        'rabbitmq', 'mongodb', 'cassandra', 'dynamodb', 'sqlite', 'memcached', 'caching',
+        'event-driven', 'distributed systems', 'microservices architecture', 'api gateway',
+        'service mesh', 'jwt', 'oauth', 'authentication', 'authorization'
+    ]
+
+    # Specific Python backend responsibilities in the CV text
+    responsibility_keywords = [
+        'architected', 'designed', 'implemented', 'developed', 'built', 'created',
+        'microservices', 'apis', 'backend', 'server', 'database', 'cloud', 'aws',
+        'deployed', 'maintained', 'optimized', 'scaled', 'tested'
+    ]
+
+    # Keyword lists compiled once for skill classification
+    python_stack_automaton = PhraseAutomaton(python_stack_keywords)
+    python_weighted_automaton = PhraseAutomaton(python_weighted_keywords)
+    proficiency_scanner = KeywordScanner(proficiency_keywords)
+    # Job-independent keyword groups stored in CVFeatures
+    feature_scanner = KeywordScanner({
+        'expert': proficiency_keywords['expert'],
+        'intermediate': proficiency_keywords['intermediate'],
+        'python_backend': python_backend_keywords,
+        'responsibility': responsibility_keywords
+    })
+
     def __init__(self):
         self.nlp_matcher = NLPMatcher()
+        # Integer ids for taxonomy skills; batches extend a copy with the free-text skills they contain
+        self.skill_vocabulary = SkillVocabulary(sorted(self.nlp_matcher.taxonomy_terms))
         try:
             self.deepseek_evaluator = DeepseekEvaluator()
             self.use_ai = True
@@ -14,30 +132,76 @@ class ScoringEngine:
             st.warning("Deepseek API key not found. Falling back to basic scoring.")
             self.use_ai = False
 
-    def evaluate_cv(self, cv_data, job_requirements):
-        """Main evaluation function with detailed scoring breakdown"""
+        # Compiled matcher for the job currently being scored, and the skills it was built from
+        self._job_matcher = None
+        self._job_matcher_key = None
+
+        # Keyword scanner for the CV text, rebuilt when the job's role changes
+        self._keyword_scanner = None
+        self._keyword_scanner_role = None
+
+    def get_job_matcher(self, job_requirements):
+        """Return the JobMatcher for job_requirements, compiling it only when the job changes"""
+        key = (tuple(job_requirements.get('required_skills', [])),
+               tuple(job_requirements.get('nice_to_have_skills', [])))
+        if key != self._job_matcher_key:
+            self._job_matcher = self.nlp_matcher.compile_job(job_requirements)
+            self._job_matcher_key = key
+        return self._job_matcher
+
+    def get_keyword_scanner(self, job_requirements):
+        """Return the scanner counting every CV text keyword group, including the job's role words"""
+        role = job_requirements.get('role', '')
+        if self._keyword_scanner is None or role != self._keyword_scanner_role:
+            self._keyword_scanner = KeywordScanner({
+                'expert': self.proficiency_keywords['expert'],
+                'intermediate': self.proficiency_keywords['intermediate'],
+                'python_backend': self.python_backend_keywords,
+                'responsibility': self.responsibility_keywords,
+                'role': role.lower().split()
+            })
+            self._keyword_scanner_role = role
+        return self._keyword_scanner
+
+    def evaluate_cv(self, cv_data, job_requirements, technical_skills=None, skills_match=None):
+        """Main evaluation function with detailed scoring breakdown
+
+        technical_skills and skills_match (one entry of score_skills_batch) may be passed in
+        when they were already computed for a whole batch.
+        """
         try:
-            # Get CV text
+            # Get CV text (a string or an already prepared CVDocument)
             cv_text = cv_data.get('cv_text', '')
             if not cv_text:
                 return self._create_empty_result("No CV content available")
 
+            # Normalize and segment the CV once for every scoring stage
+            document = CVDocument.from_text(cv_text)
+            cv_text = document.text
+
             # Extract technical skills from CV content
-            technical_skills = self.nlp_matcher.extract_technical_skills(cv_text)
+            if technical_skills is None:
+                technical_skills = self.nlp_matcher.extract_technical_skills(document)
+
+            if skills_match is not None:
+                skills_score, skills_breakdown, matched_required, matched_nice_to_have = skills_match
+                matched = (matched_required, matched_nice_to_have)
+            else:
+                # Match required and nice-to-have skills once, with the job compiled ahead of time
+                job_matcher = self.get_job_matcher(job_requirements)
+                (_, matched_required), (_, matched_nice_to_have) = job_matcher.match_candidate(technical_skills)
+                matched = (matched_required, matched_nice_to_have)
+
+            # Matches, keyword counts and Python stack flags shared by every scoring stage
+            context = self._create_context(document, cv_data.get('years_experience', 0),
+                                           technical_skills, job_requirements, matched)
 
             # Calculate Skills Match (0-100 points)
-            skills_score, skills_breakdown = self._calculate_skills_match(
-                technical_skills,
-                job_requirements,
-                cv_text
-            )
+            if skills_match is None:
+                skills_score, skills_breakdown = self._calculate_skills_match(context)
 
             # Calculate Experience Match (0-100 points)
-            experience_score, experience_breakdown = self._calculate_experience_match(
-                cv_text,
-                cv_data.get('years_experience', 0),
-                job_requirements
-            )
+            experience_score, experience_breakdown = self._calculate_experience_match(context, job_requirements)
 
             # Calculate overall score (average of skills and experience)
             overall_score = (skills_score + experience_score) / 2
@@ -50,36 +214,11 @@ class ScoringEngine:
                 except Exception as e:
                     st.warning(f"AI analysis failed: {str(e)}")
 
-            # Find matched and missing skills
-            required_skills = job_requirements.get('required_skills', [])
-            nice_to_have_skills = job_requirements.get('nice_to_have_skills', [])
-
-            _, matched_required = self.nlp_matcher.match_skills(technical_skills, required_skills)
-            _, matched_nice_to_have = self.nlp_matcher.match_skills(technical_skills, nice_to_have_skills)
-
-            missing_required = list(set(required_skills) - set(matched_required))
-            missing_nice_to_have = list(set(nice_to_have_skills) - set(matched_nice_to_have))
-
-            # Get Python specific skills
-            python_stack_keywords = [
-                'python', 'py', 'fastapi', 'asyncio', 'async/await', 'boto3', 'sqlalchemy', 
-                'pydantic', 'pytest', 'poetry', 'alembic', 'grafana', 'opentelemetry', 
-                'microservices', 'postgresql', 'aws', 'docker', 'kubernetes', 'django', 'flask',
-                'celery', 'pandas', 'numpy', 'scipy', 'scikit-learn', 'tensorflow', 'pytorch',
-                'keras', 'matplotlib', 'seaborn', 'requests', 'beautifulsoup', 'scrapy', 'selenium',
-                'airflow', 'prefect', 'streamlit', 'dash', 'plotly', 'pyspark', 'dask', 'ray',
-                'gunicorn', 'uvicorn', 'starlette', 'typer', 'click', 'pipenv', 'virtualenv',
-                'conda', 'jupyter', 'pillow', 'opencv', 'nltk', 'spacy', 'gensim', 'transformers',
-                'huggingface', 'langchain', 'redis', 'kafka'
-            ]
-            python_specific_skills = [skill for skill in technical_skills 
-                                    if any(kw in skill.lower() for kw in python_stack_keywords)]
-            
-            # Required Python skills assessment
-            python_required = [skill for skill in required_skills 
-                              if any(kw in skill.lower() for kw in python_stack_keywords)]
-            matched_python_required = [skill for skill in matched_required 
-                                      if any(kw in skill.lower() for kw in python_stack_keywords)]
+            # Python skills found, and the required ones matched and missing
+            python_specific_skills = context.python_skills
+            python_required = [skill for skill in context.required_skills if skill in context.python_stack_required]
+            matched_python_required = [skill for skill in context.matched_required
+                                       if skill in context.python_stack_required]
             missing_python_skills = set(python_required) - set(matched_python_required)
             
             # Calculate Python-specific match percentage
@@ -116,10 +255,10 @@ class ScoringEngine:
             result = {
                 'overall_score': overall_score,
                 'technical_skills': technical_skills,
-                'matched_required_skills': matched_required,
-                'matched_nice_to_have': matched_nice_to_have,
-                'missing_critical_skills': missing_required,
-                'missing_nice_to_have': missing_nice_to_have,
+                'matched_required_skills': context.matched_required,
+                'matched_nice_to_have': context.matched_nice_to_have,
+                'missing_critical_skills': context.missing_required,
+                'missing_nice_to_have': context.missing_nice_to_have,
                 'evaluation_notes': evaluation_notes,
                 'skills_score': skills_score,
                 'experience_score': experience_score,
@@ -131,25 +270,32 @@ class ScoringEngine:
         except Exception as e:
             return self._create_empty_result(f"Error during evaluation: {str(e)}")
 
-    def _calculate_skills_match(self, technical_skills, job_requirements, cv_text):
+    def _create_context(self, document, years_experience, technical_skills, job_requirements, matched):
+        """Build the EvaluationContext of one CV, classifying each skill once"""
+        keyword_counts = self.get_keyword_scanner(job_requirements).count(document.lower)
+        context = EvaluationContext(document, years_experience, technical_skills, job_requirements,
+                                    matched, keyword_counts)
+        context.python_skills = [skill for skill in technical_skills if self._is_python_stack(skill)]
+        for skill in set(context.required_skills):
+            if self._is_python_stack(skill):
+                context.python_stack_required.add(skill)
+            if self._is_python_weighted(skill):
+                context.python_weighted_required.add(skill)
+        return context
+
+    def _calculate_skills_match(self, context):
         """Calculate detailed skills match score with Python stack prioritization"""
-        required_skills = job_requirements.get('required_skills', [])
+        required_skills = context.required_skills
         if not required_skills:
             return 0, {'essential': 0, 'proficiency': 0, 'additional': 0}
 
+        matched_required = context.matched_required
+
         # Essential Skills Coverage (0-50 points)
-        _, matched_required = self.nlp_matcher.match_skills(technical_skills, required_skills)
-        
-        # Check for Python stack technologies from the JD (weighted higher)
-        python_stack_keywords = [
-            'python', 'fastapi', 'asyncio', 'async/await', 'boto3', 'sqlalchemy', 
-            'pydantic', 'pytest', 'poetry', 'alembic', 'grafana', 'opentelemetry', 
-            'microservices', 'postgresql', 'aws', 'docker', 'kubernetes'
-        ]
-        
+
         # Count Python stack matches and weight them more heavily
-        python_matches = sum(1 for skill in matched_required if any(kw in skill.lower() for kw in python_stack_keywords))
-        python_required = sum(1 for skill in required_skills if any(kw in skill.lower() for kw in python_stack_keywords))
+        python_matches = sum(1 for skill in matched_required if skill in context.python_weighted_required)
+        python_required = sum(1 for skill in required_skills if skill in context.python_weighted_required)
         
         # Calculate weighted coverage ratio
         standard_matches = len(matched_required) - python_matches
@@ -160,41 +306,14 @@ class ScoringEngine:
         weighted_total = standard_required + (python_required * 1.5)
         
         coverage_ratio = weighted_matches / weighted_total if weighted_total > 0 else 0
-        
-        if coverage_ratio >= 1:  # Allow scores over 1 due to weighting
-            essential_score = 50
-        elif coverage_ratio >= 0.75:
-            essential_score = 40
-        elif coverage_ratio >= 0.5:
-            essential_score = 25
-        else:
-            essential_score = min(10, coverage_ratio * 20)
+        essential_score = self._essential_score(coverage_ratio)
 
         # Skill Proficiency (0-30 points)
-        proficiency_keywords = {
-            'expert': ['expert', 'advanced', 'senior', 'lead', 'architect'],
-            'intermediate': ['intermediate', 'experienced', 'proficient']
-        }
-
-        cv_text_lower = cv_text.lower()
-        if any(keyword in cv_text_lower for keyword in proficiency_keywords['expert']):
-            proficiency_score = 30
-        elif any(keyword in cv_text_lower for keyword in proficiency_keywords['intermediate']):
-            proficiency_score = 20
-        else:
-            proficiency_score = 10
+        proficiency_score = self._proficiency_score(context.document, context.keyword_counts)
 
         # Additional Relevant Skills (0-20 points)
-        nice_to_have = job_requirements.get('nice_to_have_skills', [])
-        _, matched_nice_to_have = self.nlp_matcher.match_skills(technical_skills, nice_to_have)
-
-        extra_skills = len(technical_skills) - len(matched_required)
-        if extra_skills >= 5 and matched_nice_to_have:
-            additional_score = 20
-        elif extra_skills >= 3 or matched_nice_to_have:
-            additional_score = 15
-        else:
-            additional_score = 5
+        extra_skills = len(context.technical_skills) - len(matched_required)
+        additional_score = self._additional_score(extra_skills, context.matched_nice_to_have)
 
         total_score = essential_score + proficiency_score + additional_score
         breakdown = {
@@ -205,82 +324,203 @@ class ScoringEngine:
 
         return total_score, breakdown
 
-    def _calculate_experience_match(self, cv_text, years_experience, job_requirements):
-        """Calculate detailed experience match score with Python experience emphasis"""
-        required_years = job_requirements.get('required_years', 0)
-        
-        # For the Python backend role, we want 7+ years experience
-        if required_years == 0:
-            required_years = 7
-
-        # Years of Experience (0-50 points)
-        if years_experience >= required_years:
-            years_score = 50
-        elif years_experience >= required_years - 2:  # Within 2 years of required
-            years_score = 40
-        elif years_experience >= required_years - 4:  # Within 4 years of required
-            years_score = 25
-        else:
-            years_score = max(0, 50 - ((required_years - years_experience) * 7))  # Steeper penalty
+    def _is_python_stack(self, skill):
+        """Check whether a skill belongs to the Python stack reported in the evaluation notes"""
+        return self.python_stack_automaton.contains_any(skill.lower())
 
-        # Industry Alignment (0-30 points)
-        cv_text_lower = cv_text.lower()
-        
-        # Python backend specific keywords
-        python_backend_keywords = [
-            'python', 'backend', 'server', 'microservice', 'api', 'fastapi', 'django', 'flask',
-            'aws', 'cloud', 'database', 'sql', 'nosql', 'postgresql', 'asyncio', 'asynchronous',
-            'software engineer', 'software developer', 'backend developer', 'backend engineer',
-            'data validation', 'orm', 'testing', 'ci/cd', 'devops', 'containerization',
-            'pydantic', 'pytest', 'poetry', 'alembic', 'sqlalchemy', 'boto3', 'grafana', 
-            'opentelemetry', 'starlette', 'uvicorn', 'gunicorn', 'celery', 'redis', 'kafka',
-            'elasticsearch', 'pyramid', 'tornado', 'aiohttp', 'sanic', 'falcon', 'graphql',
-            'grpc', 'protobuf', 'websocket', 'docker', 'kubernetes', 'terraform', 'ansible',
-            'jenkins', 'github actions', 'gitlab ci', 'circleci', 'prometheus', 'datadog',
-            'rabbitmq', 'mongodb', 'cassandra', 'dynamodb', 'sqlite', 'memcached', 'caching',
-            'event-driven', 'distributed systems', 'microservices architecture', 'api gateway',
-            'service mesh', 'jwt', 'oauth', 'authentication', 'authorization'
-        ]
-        
-        # Count how many Python backend keywords are found in the CV
-        backend_matches = sum(1 for keyword in python_backend_keywords if keyword in cv_text_lower)
-        
-        # Calculate score based on Python backend keyword matches
-        if backend_matches >= 15:  # Exceptional Python backend experience
-            industry_score = 30
-        elif backend_matches >= 10:  # Strong Python backend experience
-            industry_score = 25
-        elif backend_matches >= 7:  # Good Python backend experience
-            industry_score = 20
-        elif backend_matches >= 4:  # Some Python backend experience
-            industry_score = 15
-        else:  # Limited Python backend experience
-            industry_score = 10
-            
-        # General industry keywords from job requirements
-        industry_keywords = job_requirements.get('role', '').lower().split()
-        role_matches = sum(1 for keyword in industry_keywords if keyword in cv_text_lower)
-        
-        # Boost industry score if general role matches are high
-        if role_matches >= len(industry_keywords) * 0.8:
-            industry_score = max(industry_score, 25)
-        
-        # Role Responsibilities (0-20 points)
-        # Check for specific Python backend responsibilities
-        responsibility_keywords = [
-            'architected', 'designed', 'implemented', 'developed', 'built', 'created',
-            'microservices', 'apis', 'backend', 'server', 'database', 'cloud', 'aws',
-            'deployed', 'maintained', 'optimized', 'scaled', 'tested'
-        ]
-        
-        resp_matches = sum(1 for keyword in responsibility_keywords if keyword in cv_text_lower)
-        
-        if resp_matches >= 10 and years_experience >= required_years - 2:
-            responsibility_score = 20
-        elif resp_matches >= 6:
-            responsibility_score = 15
+    def _is_python_weighted(self, skill):
+        """Check whether a skill belongs to the Python stack weighted 1.5x"""
+        return self.python_weighted_automaton.contains_any(skill.lower())
+
+    def _essential_score(self, coverage_ratio):
+        """Essential skills points (0-50) for a weighted coverage ratio (or an array of them)"""
+        # Allow ratios over 1 due to weighting
+        return _select([coverage_ratio >= 1, coverage_ratio >= 0.75, coverage_ratio >= 0.5],
+                       [50, 40, 25], _at_most(coverage_ratio * 20, 10))
+
+    def _proficiency_score(self, cv_text, keyword_counts=None):
+        """Skill proficiency points (0-30) from proficiency keywords in the CV text or CVDocument"""
+        if keyword_counts is None:
+            keyword_counts = self.proficiency_scanner.count(CVDocument.from_text(cv_text).lower)
+        return self._proficiency_points(keyword_counts['expert'], keyword_counts['intermediate'])
+
+    def _proficiency_points(self, expert, intermediate):
+        """Skill proficiency points (0-30) from expert and intermediate keyword counts (or flag arrays)"""
+        return _select([expert, intermediate], [30, 20], 10)
+
+    def _additional_score(self, extra_skills, matched_nice_to_have):
+        """Additional skills points (0-20) from unmatched extra skills and nice-to-have matches
+        (or arrays of extra skill counts and nice-to-have flags)"""
+        if not isinstance(matched_nice_to_have, np.ndarray):
+            matched_nice_to_have = bool(matched_nice_to_have)
+        return _select([(extra_skills >= 5) & matched_nice_to_have, (extra_skills >= 3) | matched_nice_to_have],
+                       [20, 15], 5)
+
+    def score_skills_batch(self, skill_lists, job_requirements, cv_texts):
+        """Skills scores for a batch of CVs, with matching and coverage computed as matrix operations
+
+        Returns one (skills_score, breakdown, matched_required, matched_nice_to_have) tuple per CV,
+        the same values evaluate_cv computes for each CV on its own.
+        """
+        job_matcher = self.get_job_matcher(job_requirements)
+        skill_matrix = SkillMatrix(skill_lists, self.skill_vocabulary.copy())
+        matched_required, matched_nice_to_have, coverage_ratios, extra_skills, has_nice_to_have = \
+            self._skills_arrays(job_matcher, skill_matrix)
+        required_skills = job_requirements.get('required_skills', [])
+        keyword_scanner = self.get_keyword_scanner(job_requirements)
+
+        results = []
+        for row, cv_text in enumerate(cv_texts):
+            required_row = job_matcher.matched_skills(job_matcher.distinct_required, matched_required[row])
+            nice_row = job_matcher.matched_skills(job_matcher.distinct_nice_to_have, matched_nice_to_have[row])
+            # evaluate_cv returns an empty result for a CV without text, so its score is never used
+            if not required_skills or not cv_text:
+                results.append((0, {'essential': 0, 'proficiency': 0, 'additional': 0}, required_row, nice_row))
+                continue
+
+            essential_score = self._essential_score(float(coverage_ratios[row]))
+            keyword_counts = keyword_scanner.count(CVDocument.from_text(cv_text).lower)
+            proficiency_score = self._proficiency_score(cv_text, keyword_counts)
+            additional_score = self._additional_score(int(extra_skills[row]), bool(has_nice_to_have[row]))
+            breakdown = {
+                'essential': essential_score,
+                'proficiency': proficiency_score,
+                'additional': additional_score
+            }
+            results.append((essential_score + proficiency_score + additional_score, breakdown, required_row, nice_row))
+        return results
+
+    def _skills_arrays(self, job_matcher, skill_matrix):
+        """Matched requirement matrices, weighted coverage ratios, extra skill counts and
+        nice-to-have flags of every CV in skill_matrix for one job"""
+        matched_required, matched_nice_to_have = job_matcher.match_matrix(skill_matrix)
+
+        # Weighted coverage of the required skills for every CV at once
+        required_skills = job_matcher.required_skills
+        python_weighted = np.array([self._is_python_weighted(skill) for skill, _, _ in job_matcher.distinct_required],
+                                   dtype=np.int64)
+        matched_counts = matched_required.sum(axis=1)
+        python_matches = matched_required.astype(np.int64) @ python_weighted
+        python_required = sum(1 for skill in required_skills if self._is_python_weighted(skill))
+        weighted_matches = (matched_counts - python_matches) + (python_matches * 1.5)
+        weighted_total = (len(required_skills) - python_required) + (python_required * 1.5)
+        if weighted_total > 0:
+            coverage_ratios = weighted_matches / weighted_total
         else:
-            responsibility_score = 10
+            coverage_ratios = np.zeros(len(skill_matrix))
+        extra_skills = skill_matrix.skill_counts - matched_counts
+        has_nice_to_have = matched_nice_to_have.any(axis=1)
+        return matched_required, matched_nice_to_have, coverage_ratios, extra_skills, has_nice_to_have
+
+    @property
+    def feature_version(self):
+        """Identity of the feature extractor: feature format, taxonomy and CV keyword lists"""
+        source = json.dumps([FEATURE_FORMAT, self.nlp_matcher.taxonomy.source_hash, self.proficiency_keywords,
+                             self.python_backend_keywords, self.responsibility_keywords])
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+    def open_feature_store(self, path=FEATURE_STORE_PATH):
+        """Open the feature store holding this extractor version's CV features"""
+        return FeatureStore(path, self.feature_version)
+
+    def extract_features(self, cv_data, workers=1, store=None):
+        """CVFeatures of every CV with its row's years, reading unchanged CVs from store and saving
+        newly extracted ones (without years)"""
+        cv_data = list(cv_data)
+        documents = [CVDocument.from_text(cv.get('cv_text', '')) for cv in cv_data]
+        hashes = [content_hash(document.text) for document in documents]
+        stored = store.get_many(hashes) if store is not None else {}
+
+        # Extract skills only for CVs whose features are not stored yet
+        missing = [row for row, cv_hash in enumerate(hashes) if cv_hash not in stored]
+        missing_skills = self.nlp_matcher.extract_technical_skills_batch([documents[row] for row in missing],
+                                                                         workers=workers)
+        extracted = {}
+        for row, skills in zip(missing, missing_skills):
+            document = documents[row]
+            keyword_counts = self.feature_scanner.count(document.lower)
+            if keyword_counts['expert']:
+                tier = 'expert'
+            elif keyword_counts['intermediate']:
+                tier = 'intermediate'
+            else:
+                tier = 'basic'
+            extracted[hashes[row]] = CVFeatures(hashes[row], skills, None, bool(document),
+                                                keyword_counts['python_backend'], keyword_counts['responsibility'],
+                                                tier, '\n'.join(document.token_set))
+
+        if store is not None and extracted:
+            store.put_many(extracted.values())
+
+        # Years of experience belong to the row, so the same CV may be scored with different years
+        features = []
+        for cv, cv_hash in zip(cv_data, hashes):
+            years = cv.get('years_experience', 0)
+            if isinstance(years, np.generic):
+                years = years.item()
+            features.append((stored.get(cv_hash) or extracted[cv_hash]).with_years(years))
+        return features
+
+    def score_matrix(self, cv_data, jobs, workers=1, store=None):
+        """Score every CV against every job, sharing the per-CV work across jobs
+
+        Features (extracted skills and keyword counts) are computed once per CV, or read from a
+        FeatureStore when given; see score_features.
+        """
+        return self.score_features(self.extract_features(cv_data, workers, store), jobs)
+
+    def score_features(self, features, jobs):
+        """Score CVFeatures against every job without the CV text
+
+        Each job adds one batch match, and the scores of all jobs are computed as array operations.
+        Returns (overall, skills, experience) arrays of shape (CVs, jobs) with the scores
+        evaluate_cv gives each pair (AI analysis does not affect scores and is skipped).
+        """
+        features = list(features)
+        jobs = list(jobs)
+        skill_matrix = SkillMatrix([cv.skills for cv in features], self.skill_vocabulary.copy())
+
+        def counts(name):
+            return np.array([getattr(cv, name) for cv in features], dtype=np.int64)
+
+        # evaluate_cv gives CVs without text, or without numeric years, an empty result
+        scored = np.array([cv.has_text and isinstance(cv.years_experience, (int, float))
+                           for cv in features], dtype=bool)
+        years = np.array([cv.years_experience if valid else 0 for cv, valid in zip(features, scored)], dtype=float)
+
+        # Skills Match (0-100 points), per job
+        skills = np.zeros((len(features), len(jobs)))
+        tiers = np.array([cv.proficiency_tier for cv in features], dtype=object)
+        proficiency = self._proficiency_points(tiers == 'expert', tiers == 'intermediate')
+        for column, job in enumerate(jobs):
+            if not job.get('required_skills', []):
+                continue
+            job_matcher = self.nlp_matcher.compile_job(job)
+            _, _, coverage, extra_skills, has_nice_to_have = self._skills_arrays(job_matcher, skill_matrix)
+            skills[:, column] = (self._essential_score(coverage) + proficiency
+                                 + self._additional_score(extra_skills, has_nice_to_have))
+
+        # Experience Match (0-100 points), CVs as rows and jobs as columns
+        required_years = np.array([[job.get('required_years', 0) for job in jobs]], dtype=float)
+        role_words = [job.get('role', '').lower().split() for job in jobs]
+        role_matches = np.array([[sum(1 for word in words if word in cv.tokens) for words in role_words]
+                                 for cv in features], dtype=np.int64).reshape(len(features), len(jobs))
+        years_score, industry_score, responsibility_score = self._experience_scores(
+            years[:, None], required_years, counts('backend_matches')[:, None], role_matches,
+            np.array([[len(words) for words in role_words]]), counts('responsibility_matches')[:, None])
+        experience = years_score + industry_score + responsibility_score
+
+        skills[~scored] = 0
+        experience = np.where(scored[:, None], experience, 0).astype(float)
+        return (skills + experience) / 2, skills, experience
+
+    def _calculate_experience_match(self, context, job_requirements):
+        """Calculate detailed experience match score with Python experience emphasis"""
+        keyword_counts = context.keyword_counts
+        years_score, industry_score, responsibility_score = self._experience_scores(
+            context.years_experience, job_requirements.get('required_years', 0),
+            keyword_counts['python_backend'], keyword_counts['role'],
+            len(job_requirements.get('role', '').lower().split()), keyword_counts['responsibility'])
 
         total_score = years_score + industry_score + responsibility_score
         breakdown = {
@@ -291,6 +531,36 @@ class ScoringEngine:
 
         return total_score, breakdown
 
+    def _experience_scores(self, years_experience, required_years, backend_matches, role_matches,
+                           role_word_count, resp_matches):
+        """(years, industry, responsibility) points of the experience match
+
+        Arguments are one CV's values, or NumPy arrays that broadcast over CVs and jobs.
+        """
+        # For the Python backend role, we want 7+ years experience
+        required_years = _select([required_years == 0], [7], required_years)
+
+        # Years of Experience (0-50 points): within 2 and 4 years of required, then a steeper penalty
+        years_score = _select(
+            [years_experience >= required_years, years_experience >= required_years - 2,
+             years_experience >= required_years - 4],
+            [50, 40, 25], _at_least(50 - ((required_years - years_experience) * 7), 0))
+
+        # Industry Alignment (0-30 points) from how many Python backend keywords are found in the CV:
+        # exceptional, strong, good, some, limited Python backend experience
+        industry_score = _select([backend_matches >= 15, backend_matches >= 10, backend_matches >= 7,
+                                  backend_matches >= 4], [30, 25, 20, 15], 10)
+
+        # Boost industry score if general role matches (the job's role words) are high
+        industry_score = _select([role_matches >= role_word_count * 0.8], [_at_least(industry_score, 25)],
+                                 industry_score)
+
+        # Role Responsibilities (0-20 points) from specific Python backend responsibilities
+        responsibility_score = _select(
+            [(resp_matches >= 10) & (years_experience >= required_years - 2), resp_matches >= 6], [20, 15], 10)
+
+        return years_score, industry_score, responsibility_score
+
     def _create_empty_result(self, error_message):
         """Create an empty result with error message"""
         return {
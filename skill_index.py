@@ -0,0 +1,141 @@
+from collections import Counter
+
+from phrase_automaton import PhraseAutomaton
+
+# Indexes already built in this process, keyed by taxonomy fingerprint
+_skill_index_cache = {}
+
+
+def _bigrams(name):
+    """Character bigrams of a name padded with start and end markers"""
+    padded = f'\x02{name}\x03'
+    return [padded[start:start + 2] for start in range(len(padded) - 1)]
+
+
+class SkillIndex:
+    """Fuzzy lookup index over the skill taxonomy for threshold and top-k similarity queries
+
+    Candidates come from exact and variation lookups, a short-substring index for
+    partial matches and a bigram inverted index with a length and count filter for
+    edit distance; each candidate is then scored with the same SkillSimilarity
+    engine used by get_skill_similarity.
+    """
+
+    def __init__(self, terms, similarity, fingerprint=None):
+        self.similarity = similarity
+        self.fingerprint = fingerprint
+        self.terms = [term for term in dict.fromkeys(terms) if term]
+        self.rank = {term: index for index, term in enumerate(self.terms)}
+
+        # Normalized name -> taxonomy terms that normalize to it (empty names would match everything)
+        self.terms_by_name = {}
+        for term in self.terms:
+            name = similarity.normalize(term)
+            if name:
+                self.terms_by_name.setdefault(name, []).append(term)
+        names = list(self.terms_by_name)
+
+        # Names indexed by every substring of up to three characters, to find names containing a query
+        self.names_by_gram = {}
+        for name in names:
+            for size in range(1, 4):
+                for start in range(len(name) - size + 1):
+                    self.names_by_gram.setdefault(name[start:start + size], set()).add(name)
+
+        # Names contained in a query
+        self.name_automaton = PhraseAutomaton(names)
+
+        # Padded bigram postings (with per-name counts) and length buckets for edit distance
+        self.names_by_length = {}
+        self.bigram_postings = {}
+        for name in names:
+            self.names_by_length.setdefault(len(name), []).append(name)
+            for gram, count in Counter(_bigrams(name)).items():
+                self.bigram_postings.setdefault(gram, []).append((name, count))
+
+    def _names_containing(self, name):
+        """Return indexed names that contain name as a substring"""
+        if len(name) <= 3:
+            return self.names_by_gram.get(name, set())
+
+        grams = [name[start:start + 3] for start in range(len(name) - 2)]
+        postings = sorted((self.names_by_gram.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return {candidate for candidate in candidates if name in candidate}
+
+    def _candidate_names(self, name, threshold):
+        """Collect names that may reach threshold similarity with name"""
+        candidates = set()
+        if name in self.terms_by_name:
+            candidates.add(name)
+        candidates.update(var for var in self.similarity.skill_variations.get(name, ()) if var in self.terms_by_name)
+
+        if threshold <= 0.8:
+            candidates.update(self._names_containing(name))
+            candidates.update(self.name_automaton.find_all(name))
+
+        candidates.update(self._edit_distance_candidates(name, threshold))
+        return candidates
+
+    def _edit_distance_candidates(self, name, threshold):
+        """Names whose edit distance to name may be small enough to reach threshold"""
+        def max_distance(length):
+            # similarity >= threshold means distance <= (1 - threshold) * longest
+            return int((1.0 - threshold) * max(len(name), length) + 1e-9)
+
+        def required_common(length):
+            # Count filter: strings within distance k share >= longest + 1 - 2k padded bigrams
+            return max(len(name), length) + 1 - 2 * max_distance(length)
+
+        common = Counter()
+        for gram, query_count in Counter(_bigrams(name)).items():
+            for candidate, count in self.bigram_postings.get(gram, ()):
+                common[candidate] += min(query_count, count)
+
+        candidates = set()
+        for candidate, shared in common.items():
+            length = len(candidate)
+            if abs(len(name) - length) <= max_distance(length) and shared >= required_common(length):
+                candidates.add(candidate)
+
+        # When the filter can't rule anything out, every name of a reachable length is a candidate
+        for length, bucket in self.names_by_length.items():
+            if abs(len(name) - length) <= max_distance(length) and required_common(length) <= 0:
+                candidates.update(bucket)
+        return candidates
+
+    def search(self, skill, threshold=0.7):
+        """Return (term, similarity) pairs for taxonomy terms with similarity >= threshold, best first"""
+        name = self.similarity.normalize(skill)
+        if not name:
+            return []
+
+        matches = []
+        for candidate in self._candidate_names(name, threshold):
+            score = self.similarity.normalized_similarity(name, candidate)
+            if score >= threshold:
+                matches.extend((term, score) for term in self.terms_by_name[candidate])
+
+        matches.sort(key=lambda match: (-match[1], self.rank[match[0]]))
+        return matches
+
+    def top_k(self, skill, k=5, min_similarity=0.5):
+        """Return the k most similar taxonomy terms, widening the search only as far as needed"""
+        threshold = 1.0
+        while True:
+            matches = self.search(skill, threshold)
+            if len(matches) >= k or threshold <= min_similarity:
+                return matches[:k]
+            threshold = max(min_similarity, round(threshold - 0.1, 2))
+
+
+def get_skill_index(terms, similarity, fingerprint):
+    """Return the index for a taxonomy fingerprint, building it only the first time it is seen"""
+    index = _skill_index_cache.get(fingerprint)
+    if index is None:
+        index = _skill_index_cache[fingerprint] = SkillIndex(terms, similarity, fingerprint)
+    return index
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class SkillVocabulary:
+    """Interns lowered skill names into dense integer ids"""
+
+    def __init__(self, skills=()):
+        self.ids = {}
+        self.skills = []
+        for skill in skills:
+            self.intern(skill)
+
+    def __len__(self):
+        return len(self.skills)
+
+    def copy(self):
+        """Return a vocabulary with the same ids that can be extended independently"""
+        vocabulary = SkillVocabulary()
+        vocabulary.ids = dict(self.ids)
+        vocabulary.skills = list(self.skills)
+        return vocabulary
+
+    def intern(self, skill):
+        """Return the id of a skill, assigning the next free id the first time it is seen"""
+        skill = skill.lower()
+        skill_id = self.ids.get(skill)
+        if skill_id is None:
+            skill_id = self.ids[skill] = len(self.skills)
+            self.skills.append(skill)
+        return skill_id
+
+
+class SkillMatrix:
+    """Sparse CV x skill incidence matrix (CSR arrays of skill ids) for a batch of CVs"""
+
+    def __init__(self, skill_lists, vocabulary):
+        self.vocabulary = vocabulary
+        rows = [np.unique(np.fromiter((vocabulary.intern(skill) for skill in skills), dtype=np.int64))
+                for skills in skill_lists]
+
+        # Number of skills each CV listed, duplicates included, as len(technical_skills) would give
+        self.skill_counts = np.array([len(skills) for skills in skill_lists], dtype=np.int64)
+        self.indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=self.indptr[1:])
+        self.indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.skill_counts)
+
+    def skill_ids(self):
+        """Distinct skill ids used by at least one CV"""
+        return np.unique(self.indices)
+
+    def dense(self, columns):
+        """Boolean (CV x len(columns)) matrix restricted to the given skill ids"""
+        position = np.full(len(self.vocabulary), -1, dtype=np.int64)
+        position[columns] = np.arange(len(columns))
+        mapped = position[self.indices]
+        keep = mapped >= 0
+        cv_rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+
+        matrix = np.zeros((len(self), len(columns)), dtype=bool)
+        matrix[cv_rows[keep], mapped[keep]] = True
+        return matrix
@@ -0,0 +1,117 @@
+from functools import lru_cache
+
+
+def levenshtein_distance(s1, s2, max_distance=None):
+    """Calculate the Levenshtein distance between two strings
+
+    When max_distance is given, only the band of cells within max_distance of the
+    diagonal is computed and max_distance + 1 is returned as soon as the distance
+    is known to exceed it.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    if max_distance is None:
+        max_distance = len(s1)
+    if len(s1) - len(s2) > max_distance:
+        return max_distance + 1
+    if len(s2) == 0:
+        return len(s1)
+
+    # Cells outside the band can never come back under the bound, so they stay at `limit`
+    limit = max_distance + 1
+    previous_row = [j if j <= max_distance else limit for j in range(len(s2) + 1)]
+    for i, c1 in enumerate(s1, 1):
+        low = max(1, i - max_distance)
+        high = min(len(s2), i + max_distance)
+        current_row = [limit] * (len(s2) + 1)
+        if i <= max_distance:
+            current_row[0] = i
+        row_min = current_row[low - 1]
+        for j in range(low, high + 1):
+            insertions = previous_row[j] + 1
+            deletions = current_row[j - 1] + 1
+            substitutions = previous_row[j - 1] + (c1 != s2[j - 1])
+            cell = min(insertions, deletions, substitutions, limit)
+            current_row[j] = cell
+            if cell < row_min:
+                row_min = cell
+        # Every path to the final cell passes through this row
+        if row_min > max_distance:
+            return limit
+        previous_row = current_row
+
+    return min(previous_row[-1], limit)
+
+
+class SkillSimilarity:
+    """Memoized skill similarity with threshold-aware early exit"""
+
+    def __init__(self, normalize, skill_variations, cache_size=65536):
+        self.skill_variations = skill_variations
+        # Cache of normalized names, and of results keyed on the normalized pair
+        self._normalize = lru_cache(maxsize=cache_size)(normalize)
+        self._pair_similarity = lru_cache(maxsize=cache_size)(self._compute_similarity)
+        self._pair_exceeds = lru_cache(maxsize=cache_size)(self._compute_exceeds)
+
+    def normalize(self, skill):
+        """Return the normalized form of a skill name"""
+        if not isinstance(skill, str):
+            return ''
+        return self._normalize(skill)
+
+    def similarity(self, skill1, skill2):
+        """Compute similarity between two skills"""
+        if not skill1 or not skill2:
+            return 0.0
+        return self._pair_similarity(self.normalize(skill1), self.normalize(skill2))
+
+    def normalized_similarity(self, name1, name2):
+        """Compute similarity between two names that are already normalized"""
+        if not name1 or not name2:
+            return 0.0
+        return self._pair_similarity(name1, name2)
+
+    def is_similar(self, skill1, skill2, threshold):
+        """Check whether similarity(skill1, skill2) > threshold without computing distances it can't reach"""
+        if not skill1 or not skill2:
+            return 0.0 > threshold
+        return self._pair_exceeds(self.normalize(skill1), self.normalize(skill2), threshold)
+
+    def _fixed_similarity(self, skill1, skill2):
+        """Similarity from exact, variation and partial matches, or None if edit distance decides"""
+        # Exact match
+        if skill1 == skill2:
+            return 1.0
+
+        # Check variations
+        if skill1 in self.skill_variations and skill2 in self.skill_variations[skill1]:
+            return 1.0
+
+        # Partial match
+        if skill1 in skill2 or skill2 in skill1:
+            return 0.8
+
+        return None
+
+    def _compute_similarity(self, skill1, skill2):
+        similarity = self._fixed_similarity(skill1, skill2)
+        if similarity is not None:
+            return similarity
+
+        # Levenshtein distance as last resort
+        return 1.0 - (levenshtein_distance(skill1, skill2) / max(len(skill1), len(skill2)))
+
+    def _compute_exceeds(self, skill1, skill2, threshold):
+        similarity = self._fixed_similarity(skill1, skill2)
+        if similarity is not None:
+            return similarity > threshold
+
+        # similarity > threshold needs distance < (1 - threshold) * longest; the extra
+        # unit of slack keeps float rounding out of the bound, the exact check follows
+        longest = max(len(skill1), len(skill2))
+        max_distance = max(0, int((1.0 - threshold) * longest) + 1)
+        distance = levenshtein_distance(skill1, skill2, max_distance)
+        if distance > max_distance:
+            return False
+        return 1.0 - (distance / longest) > threshold
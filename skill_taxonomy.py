@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+from types import MappingProxyType
+
+from phrase_automaton import PhraseAutomaton
+
+# Source data file (edit this, then bump its "version") and the compiled artifact built from it
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.pickle')
+
+# Bump when CompiledTaxonomy changes shape so stale artifacts are rebuilt
+ARTIFACT_FORMAT = 1
+
+# Taxonomies already loaded in this process, keyed by data file path
+_taxonomy_cache = {}
+
+
+# Shape every category pattern must have: one capturing group between word boundaries
+_CATEGORY_PATTERN_SHAPE = re.compile(r'\\b\((?!\?)(?P<inner>.*)\)\\b', re.DOTALL)
+
+
+def _category_alternation(category, pattern):
+    """The alternation inside a category pattern of the form \b(...)\b"""
+    shape = _CATEGORY_PATTERN_SHAPE.fullmatch(pattern)
+    inner = shape.group('inner') if shape else None
+    if inner is not None:
+        try:
+            # The inner text must be balanced on its own, so the group spans the whole pattern
+            re.compile(inner)
+        except re.error:
+            inner = None
+    if inner is None:
+        raise ValueError(f"Skill category '{category}' pattern must have the form \\b(...)\\b: {pattern}")
+    return inner
+
+
+def compile_category_patterns(patterns):
+    """Compile per-category regexes into a single pattern with one named group per category"""
+    # Every category pattern has the form \b(...)\b, so a shared word boundary gates the scan
+    # to positions where at least one category matches; each category is then captured there
+    alternatives = '|'.join(_category_alternation(category, pattern) for category, pattern in patterns.items())
+    groups = ''.join(f'(?:(?=(?P<{category}>{pattern})))?' for category, pattern in patterns.items())
+    return re.compile(rf'\b(?=(?:{alternatives})\b){groups}', re.IGNORECASE)
+
+
+def _flatten_groups(groups):
+    """Join the commented groups of the data file back into one ordered list"""
+    return [sys.intern(term) for terms in groups.values() for term in terms]
+
+
+class CompiledTaxonomy:
+    """Skill taxonomy with the automata, reverse indexes and regexes NLPMatcher needs, built once
+
+    Instances are shared by every NLPMatcher in the process and must be treated as read-only;
+    the mappings are exposed as read-only proxies once loaded.
+    """
+
+    def __init__(self, data, source_hash):
+        self.version = data['version']
+        self.source_hash = source_hash
+        self.artifact_format = ARTIFACT_FORMAT
+
+        # Technical skills patterns, scanned together through one union regex
+        self.tech_skills_patterns = dict(data['tech_skills_patterns'])
+        self.tech_skills_regex = compile_category_patterns(self.tech_skills_patterns)
+
+        # Standard names for common skill variations, applied by normalize_skill_name
+        self.skill_name_replacements = {}
+        for replacements in data['skill_name_replacements'].values():
+            for skill, standard in replacements.items():
+                self.skill_name_replacements[sys.intern(skill)] = sys.intern(standard)
+
+        # Skill variations and synonyms
+        self.skill_variations = {
+            sys.intern(base_skill): tuple(sys.intern(var) for var in variations)
+            for base_skill, variations in data['skill_variations'].items()
+        }
+
+        # Phrase vocabularies in priority order (earlier skill keywords win)
+        self.specific_phrases = tuple(_flatten_groups(data['specific_phrases']))
+        self.skill_keywords = tuple(_flatten_groups(data['skill_keywords']))
+        self.specific_phrase_set = frozenset(self.specific_phrases)
+        self.phrase_automaton = PhraseAutomaton(self.specific_phrases)
+        self.keyword_automaton = PhraseAutomaton(self.skill_keywords)
+
+        self._build_variation_index()
+
+    def _build_variation_index(self):
+        """Precompute the lookups used to expand a found skill into its variations"""
+        # Exact lookups: a base skill, or one of the variations listed under it
+        variation_index = {}
+        for base_skill, variations in self.skill_variations.items():
+            variation_index.setdefault(base_skill, set()).add(base_skill)
+            for var in variations:
+                variation_index.setdefault(var, set()).add(base_skill)
+        self.variation_index = {skill: frozenset(bases) for skill, bases in variation_index.items()}
+
+        # Substring lookups: skills contained in a base skill name, and base skill names contained in a skill
+        base_skill_substrings = {}
+        for base_skill in self.skill_variations:
+            for start in range(len(base_skill)):
+                for end in range(start + 1, len(base_skill) + 1):
+                    base_skill_substrings.setdefault(base_skill[start:end], set()).add(base_skill)
+        self.base_skill_substrings = {skill: frozenset(bases) for skill, bases in base_skill_substrings.items()}
+        self.base_skill_automaton = PhraseAutomaton(self.skill_variations)
+
+        # Every term that can be expanded and cached by NLPMatcher.expand_skill
+        self.taxonomy_terms = frozenset(self.variation_index) | self.specific_phrase_set | frozenset(self.skill_keywords)
+
+    def _freeze(self):
+        """Expose the mappings read-only so a shared instance can't be modified by one matcher"""
+        for name in ('tech_skills_patterns', 'skill_name_replacements', 'skill_variations',
+                     'variation_index', 'base_skill_substrings'):
+            value = getattr(self, name)
+            if not isinstance(value, MappingProxyType):
+                setattr(self, name, MappingProxyType(value))
+        return self
+
+    def __getstate__(self):
+        # Read-only proxies can't be pickled, so store the underlying dicts
+        state = dict(self.__dict__)
+        for name, value in state.items():
+            if isinstance(value, MappingProxyType):
+                state[name] = dict(value)
+        return state
+
+
+def _read_source(path):
+    """Return the raw data file and the hash of its contents"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return raw, hashlib.sha256(raw).hexdigest()
+
+
+def _load_artifact(artifact_path, source_hash):
+    """Return the compiled artifact if it exists and was built from the current data file"""
+    try:
+        with open(artifact_path, 'rb') as f:
+            taxonomy = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if (not isinstance(taxonomy, CompiledTaxonomy)
+            or getattr(taxonomy, 'artifact_format', None) != ARTIFACT_FORMAT
+            or taxonomy.source_hash != source_hash):
+        return None
+    return taxonomy
+
+
+def build_taxonomy_artifact(path=TAXONOMY_PATH, artifact_path=ARTIFACT_PATH):
+    """Compile the data file and write the artifact next to it"""
+    raw, source_hash = _read_source(path)
+    taxonomy = CompiledTaxonomy(json.loads(raw), source_hash)
+
+    # Write to a temporary file first so a running process never reads a partial artifact
+    temp_path = f'{artifact_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump(taxonomy, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, artifact_path)
+    return taxonomy._freeze()
+
+
+def load_taxonomy(path=TAXONOMY_PATH, artifact_path=ARTIFACT_PATH):
+    """Return the compiled taxonomy for this process, loading the artifact only the first time
+
+    Falls back to compiling the data file in memory when the artifact is missing or stale.
+    """
+    taxonomy = _taxonomy_cache.get(path)
+    if taxonomy is None:
+        raw, source_hash = _read_source(path)
+        taxonomy = _load_artifact(artifact_path, source_hash)
+        if taxonomy is None:
+            taxonomy = CompiledTaxonomy(json.loads(raw), source_hash)
+        taxonomy = _taxonomy_cache[path] = taxonomy._freeze()
+    return taxonomy
+
+
+if __name__ == '__main__':
+    # Import by module name so the artifact references skill_taxonomy.CompiledTaxonomy, not __main__
+    from skill_taxonomy import build_taxonomy_artifact
+    compiled = build_taxonomy_artifact()
+    print(f"Built {ARTIFACT_PATH} from taxonomy version {compiled.version}: "
+          f"{len(compiled.skill_variations)} base skills, {len(compiled.specific_phrases)} phrases, "
+          f"{len(compiled.skill_keywords)} keywords")
@@ -0,0 +1,213 @@
+import importlib
+import io
+from abc import ABC, abstractmethod
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+import zipfile
+from functools import lru_cache
+
+import streamlit as st
+
+# Backend used for each format: a backend name, or 'auto' for the fastest one installed
+PDF_EXTRACTOR = os.getenv('PDF_EXTRACTOR', 'auto')
+DOCX_EXTRACTOR = os.getenv('DOCX_EXTRACTOR', 'auto')
+
+
+class TextExtractor(ABC):
+    """Extracts the raw text of one document format with one library
+
+    The text only needs its words in reading order; parse_document_content normalizes whitespace.
+    """
+
+    name = None
+    format = None  # 'pdf' or 'docx'
+    module = None  # the optional package the backend needs
+    auto = True  # whether 'auto' may pick the backend; otherwise it must be selected by name
+
+    def available(self):
+        if self.module is None:
+            return True
+        try:
+            importlib.import_module(self.module)
+        except ImportError:
+            return False
+        return True
+
+    @abstractmethod
+    def extract(self, content):
+        """The raw text of a document's bytes"""
+
+
+class PyMuPDFExtractor(TextExtractor):
+    name = 'pymupdf'
+    format = 'pdf'
+    module = 'pymupdf'
+    # PyMuPDF is AGPL-3.0, which reaches a network service using it, so it is only used on request
+    auto = False
+
+    def extract(self, content):
+        import pymupdf
+        with pymupdf.open(stream=content, filetype='pdf') as document:
+            return "\n".join(page.get_text() for page in document)
+
+
+class PdfiumExtractor(TextExtractor):
+    name = 'pdfium'
+    format = 'pdf'
+    module = 'pypdfium2'
+
+    def extract(self, content):
+        import pypdfium2
+        document = pypdfium2.PdfDocument(content)
+        try:
+            pages = []
+            for page in document:
+                text_page = page.get_textpage()
+                pages.append(text_page.get_text_range())
+                text_page.close()
+                page.close()
+            return "\n".join(pages)
+        finally:
+            document.close()
+
+
+class PypdfExtractor(TextExtractor):
+    name = 'pypdf'
+    format = 'pdf'
+    module = 'pypdf'
+
+    def extract(self, content):
+        from pypdf import PdfReader
+        return "\n".join(page.extract_text() or '' for page in PdfReader(io.BytesIO(content)).pages)
+
+
+class PdfminerExtractor(TextExtractor):
+    name = 'pdfminer'
+    format = 'pdf'
+    module = 'pdfminer.high_level'
+
+    def extract(self, content):
+        from pdfminer.high_level import extract_text
+        return extract_text(io.BytesIO(content))
+
+
+class PyPDF2Extractor(TextExtractor):
+    name = 'pypdf2'
+    format = 'pdf'
+
+    def extract(self, content):
+        from PyPDF2 import PdfReader
+        text = ""
+        # A BytesIO over bytes shares them rather than copying the document
+        pdf_reader = PdfReader(io.BytesIO(content))
+        for page in pdf_reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                # Clean up text: remove extra whitespace and normalize line breaks
+                page_text = re.sub(r'\s+', ' ', page_text)
+                page_text = page_text.replace('\n\n', '\n').strip()
+                text += page_text + "\n"
+        return text
+
+
+# WordprocessingML namespace of DOCX document parts
+_WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class DocxXmlExtractor(TextExtractor):
+    """Reads the body paragraphs of word/document.xml directly, skipping python-docx's object model
+
+    Like python-docx's Paragraph.text, only the text of a paragraph's own runs and hyperlinks is
+    read, not that of text boxes, content controls or alternate content nested in them.
+    """
+
+    name = 'docx-xml'
+    format = 'docx'
+
+    _run_text = {
+        f'{_WORD_NAMESPACE}tab': '\t',
+        f'{_WORD_NAMESPACE}br': '\n',
+        f'{_WORD_NAMESPACE}cr': '\n',
+    }
+
+    def extract(self, content):
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            root = ElementTree.fromstring(archive.read('word/document.xml'))
+        body = root.find(f'{_WORD_NAMESPACE}body')
+        paragraphs = []
+        # Only the body's own paragraphs, like python-docx's Document.paragraphs
+        for paragraph in body.iterfind(f'{_WORD_NAMESPACE}p'):
+            parts = []
+            for child in paragraph:
+                if child.tag == f'{_WORD_NAMESPACE}r':
+                    runs = [child]
+                elif child.tag == f'{_WORD_NAMESPACE}hyperlink':
+                    runs = child.iterfind(f'{_WORD_NAMESPACE}r')
+                else:
+                    continue
+                for run in runs:
+                    for element in run:
+                        if element.tag == f'{_WORD_NAMESPACE}t':
+                            parts.append(element.text or '')
+                        elif element.tag in self._run_text:
+                            parts.append(self._run_text[element.tag])
+            paragraphs.append(''.join(parts))
+        return "\n".join(paragraphs)
+
+
+class PythonDocxExtractor(TextExtractor):
+    name = 'python-docx'
+    format = 'docx'
+
+    def extract(self, content):
+        from docx import Document
+        doc = Document(io.BytesIO(content))
+        return "".join(para.text + "\n" for para in doc.paragraphs)
+
+
+# Used whenever the selected backend fails or finds no text
+FALLBACK_EXTRACTORS = {
+    'pdf': PyPDF2Extractor(),
+    'docx': PythonDocxExtractor(),
+}
+
+# Backends of each format in the order 'auto' tries them. PDF backends are fastest first, as measured
+# by benchmark_extractors.py on the sample CVs, except that 'auto' never picks PyMuPDF (AGPL-3.0);
+# select it with PDF_EXTRACTOR=pymupdf. The sample corpus has no DOCX CVs yet, so python-docx
+# stays first until docx-xml has been benchmarked on real ones; select it with DOCX_EXTRACTOR=docx-xml.
+EXTRACTORS = {
+    'pdf': (PdfiumExtractor(), PyMuPDFExtractor(), FALLBACK_EXTRACTORS['pdf'], PypdfExtractor(),
+            PdfminerExtractor()),
+    'docx': (FALLBACK_EXTRACTORS['docx'], DocxXmlExtractor()),
+}
+
+
+@lru_cache(maxsize=None)
+def get_extractor(file_format, name=None):
+    """The TextExtractor configured for a format (PDF_EXTRACTOR / DOCX_EXTRACTOR unless name is given)"""
+    if name is None:
+        name = PDF_EXTRACTOR if file_format == 'pdf' else DOCX_EXTRACTOR
+    available = [extractor for extractor in EXTRACTORS[file_format] if extractor.available()]
+    if name == 'auto':
+        return next(extractor for extractor in available if extractor.auto)
+    for extractor in available:
+        if extractor.name == name:
+            return extractor
+    fallback = FALLBACK_EXTRACTORS[file_format]
+    st.warning(f"{file_format.upper()} extractor '{name}' is not installed or unknown, using {fallback.name}")
+    return fallback
+
+
+def extract_text(content, file_format, extractor=None):
+    """Raw text of a PDF or DOCX document, falling back to PyPDF2/python-docx if the backend fails"""
+    extractor = extractor or get_extractor(file_format)
+    fallback = FALLBACK_EXTRACTORS[file_format]
+    if extractor is not fallback:
+        try:
+            text = extractor.extract(content)
+            if text and text.strip():
+                return text
+        except Exception:
+            pass
+    return fallback.extract(content)
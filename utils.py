@@ -1,18 +1,19 @@
 import pandas as pd
 import streamlit as st
 import re
-from PyPDF2 import PdfReader
 from datetime import datetime
 import io
 import requests
-from docx import Document
 import mimetypes
-import os
 import json
 from google.oauth2.credentials import Credentials
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 import dateparser
+from cv_document import CVDocument
+from googleapiclient.http import MediaIoBaseDownload
+from drive_client import (CredentialsNotFoundError, DRIVE_METADATA_FIELDS, DRIVE_NUM_RETRIES, fetch_drive_metadata,
+                          get_drive_service)
+from document_cache import get_document_cache
+from text_extractors import extract_text
 
 def get_google_drive_file_url(url):
     """Convert Google Drive share URL to direct download URL"""
@@ -41,203 +42,325 @@ def get_google_drive_file_url(url):
         st.warning(f"Error processing Google Drive URL: {str(e)}")
         return None
 
-def parse_document_for_experience(cv_url):
-    """Parse PDF/DOC CV to extract first professional experience date and text content"""
+def drive_file_id(cv_url):
+    """The file ID of a Google Drive CV link"""
+    if '/file/d/' in cv_url:
+        return cv_url.split('/file/d/')[1].split('/')[0]
+    return cv_url.split('id=')[1].split('&')[0]
+
+# Drive files of these MIME types can never be parsed as a PDF/DOCX CV, so they are not downloaded
+# (Google Docs, Sheets, etc. have no binary content to download at all)
+UNSUPPORTED_MIME_PREFIXES = ('application/vnd.google-apps.', 'image/', 'video/', 'audio/', 'text/')
+
+def prefetch_drive_metadata(cv_urls):
+    """Batch the Drive metadata lookups of many CV links, as {cv_url: metadata}
+
+    The result feeds fetch_document, so each Drive CV then costs at most one request. Links that
+    are not Drive links, or whose batched lookups failed in a way a request of their own may not
+    (rate limits, server errors, a failed batch), are left out and looked up singly.
+    """
+    file_ids = {}
+    for cv_url in cv_urls:
+        if cv_url and 'drive.google.com' in cv_url:
+            try:
+                file_ids[cv_url] = drive_file_id(cv_url)
+            except IndexError:
+                continue
+    if not file_ids:
+        return {}
+
     try:
-        if not cv_url or not cv_url.strip():
-            return None, None, "No CV URL provided"
+        metadata, errors = fetch_drive_metadata(file_ids.values())
+    except CredentialsNotFoundError:
+        return {}
+    except Exception as e:
+        st.warning(f"Could not prefetch Google Drive metadata: {str(e)}")
+        return {}
+    if errors:
+        st.warning(f"Could not prefetch Google Drive metadata for some CVs: {str(errors[0])}")
+    return {cv_url: metadata[file_id] for cv_url, file_id in file_ids.items() if file_id in metadata}
+
+# Largest CV document downloaded; bigger files (usually scanned PDFs) are rejected
+MAX_DOCUMENT_BYTES = 20 * 1024 * 1024
+
+# Bytes requested per Drive download request; most CVs fit in one chunk
+DRIVE_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Bytes read at a time from a streamed HTTP download
+HTTP_CHUNK_BYTES = 64 * 1024
+
+def _too_large(size, max_bytes):
+    """Error message for a document of size bytes when it exceeds max_bytes, else None"""
+    if max_bytes and size is not None and int(size) > max_bytes:
+        return f"File too large: {int(size) / (1024 * 1024):.1f} MB exceeds the {max_bytes / (1024 * 1024):.0f} MB limit"
+    return None
+
+def _download_drive_media(service, file_id, max_bytes):
+    """Stream a Drive file's content in chunks, as (content, None) or (None, error) once it exceeds max_bytes"""
+    file_buffer = io.BytesIO()
+    downloader = MediaIoBaseDownload(file_buffer, service.files().get_media(fileId=file_id),
+                                     chunksize=DRIVE_CHUNK_BYTES)
+    done = False
+    while not done:
+        status, done = downloader.next_chunk(num_retries=DRIVE_NUM_RETRIES)
+        # The first response reports the full size, so oversized files stop after one chunk
+        error = _too_large(status.total_size, max_bytes) or _too_large(file_buffer.tell(), max_bytes)
+        if error:
+            return None, error
+    # getvalue hands over the buffer's bytes without copying them
+    return file_buffer.getvalue(), None
+
+def _download_url(response, max_bytes):
+    """Read a streamed HTTP response, as (content, None) or (None, error) once it exceeds max_bytes"""
+    error = _too_large(response.headers.get('Content-Length'), max_bytes)
+    if error:
+        return None, error
+    file_buffer = io.BytesIO()
+    for chunk in response.iter_content(chunk_size=HTTP_CHUNK_BYTES):
+        file_buffer.write(chunk)
+        error = _too_large(file_buffer.tell(), max_bytes)
+        if error:
+            return None, error
+    return file_buffer.getvalue(), None
+
+def fetch_document(cv_url, metadata=None, max_bytes=MAX_DOCUMENT_BYTES):
+    """Download a CV document from Google Drive or a URL, through the document cache
+
+    metadata is the Drive file's prefetched metadata (or the error its lookup raised); without
+    it the metadata is fetched here. Documents are streamed in chunks and abandoned as soon as
+    they exceed max_bytes. Returns (content, None), or (None, error message) when the document
+    cannot be downloaded.
+    """
+    document_cache = get_document_cache()
+
+    if 'drive.google.com' in cv_url:
+        # Handle Google Drive files
+        file_id = drive_file_id(cv_url)
+
+        # Use the direct download API endpoint
+        try:
+            # Reuse this thread's Drive API client and the process-wide credentials
+            service = get_drive_service()
+
+            # Get the file metadata first, unless it was prefetched
+            if isinstance(metadata, Exception):
+                raise metadata
+            file_metadata = metadata
+            if file_metadata is None:
+                file_metadata = service.files().get(fileId=file_id, fields=DRIVE_METADATA_FIELDS).execute(
+                    num_retries=DRIVE_NUM_RETRIES)
+            mime_type = file_metadata.get('mimeType', '')
+            if mime_type.startswith(UNSUPPORTED_MIME_PREFIXES):
+                return None, f"Unsupported file format: {mime_type}"
+            error = _too_large(file_metadata.get('size'), max_bytes)
+            if error:
+                return None, error
+
+            # Files are cached per revision, so only changed files are downloaded again
+            revision = file_metadata.get('md5Checksum') or file_metadata.get('modifiedTime')
+            cache_key = f"drive:{file_id}:{revision}" if revision else None
+            content = document_cache.get(cache_key)[0] if cache_key else None
+
+            if content is None:
+                # Get the file content
+                content, error = _download_drive_media(service, file_id, max_bytes)
+                if content is None:
+                    return None, error
+                if cache_key:
+                    document_cache.put(cache_key, content)
+
+        except CredentialsNotFoundError:
+            return None, "Google credentials not found"
+        except json.JSONDecodeError:
+            return None, "Invalid JSON format in Google credentials"
+        except Exception as e:
+            return None, f"Error accessing Google Drive: {str(e)}"
 
-        if 'drive.google.com' in cv_url:
-            # Handle Google Drive files
-            if '/file/d/' in cv_url:
-                file_id = cv_url.split('/file/d/')[1].split('/')[0]
-            else:
-                file_id = cv_url.split('id=')[1].split('&')[0]
+    else:
+        # For non-Google Drive URLs
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept': 'application/pdf,application/msword,application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        }
+        try:
+            # Revalidate a cached copy with its ETag instead of downloading it again
+            cache_key = f"url:{cv_url}"
+            cached_content, cached_metadata = document_cache.get(cache_key)
+            if cached_content is not None and cached_metadata.get('etag'):
+                headers['If-None-Match'] = cached_metadata['etag']
+
+            with requests.get(cv_url, headers=headers, verify=False, stream=True) as response:
+                if response.status_code == 304 and cached_content is not None:
+                    content = cached_content
+                elif response.status_code != 200:
+                    return None, f"Failed to download file: Status {response.status_code}"
+                else:
+                    content, error = _download_url(response, max_bytes)
+                    if content is None:
+                        return None, error
+                    if response.headers.get('ETag'):
+                        document_cache.put(cache_key, content, etag=response.headers['ETag'])
+        except Exception as e:
+            return None, f"Download error: {str(e)}"
 
-            # Use the direct download API endpoint
-            creds_json = os.getenv('GOOGLE_CREDENTIALS')
-            if not creds_json:
-                return None, None, "Google credentials not found"
+    return content, None
 
-            try:
-                creds_dict = json.loads(creds_json)
-                credentials = service_account.Credentials.from_service_account_info(
-                    creds_dict, scopes=['https://www.googleapis.com/auth/drive.readonly']
-                )
+def parse_document_content(content):
+    """Extract the text of a downloaded PDF/DOCX CV, as (None, first line, text) or (None, None, error)"""
+    # Process the file based on type
+    text = ""
+    try:
+        # Check if it's a PDF
+        if content.startswith(b'%PDF'):
+            text = extract_text(content, 'pdf')
+        # Check if it's a DOCX
+        elif content.startswith(b'PK\x03\x04'):
+            text = extract_text(content, 'docx')
+        else:
+            return None, None, "Unsupported file format"
 
-                # Build the Drive API service
-                service = build('drive', 'v3', credentials=credentials)
+        # Clean up text
+        text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
+        text = text.replace('•', '\n•')  # Preserve bullet points
+        text = re.sub(r'([.!?])\s*', r'\1\n', text)  # Split sentences
+        text = re.sub(r'\n\s*\n', '\n', text)  # Remove empty lines
+        text = text.strip()
 
-                # Get the file metadata first
-                file_metadata = service.files().get(fileId=file_id, fields='mimeType').execute()
-                mime_type = file_metadata.get('mimeType', '')
+        if not text:
+            return None, None, "No text content found in document"
 
-                # Get the file content
-                request = service.files().get_media(fileId=file_id)
-                file_buffer = io.BytesIO()
-                downloader = request.execute()
-                file_buffer.write(downloader)
-                file_buffer.seek(0)
-                content = file_buffer.read()
-
-            except json.JSONDecodeError:
-                return None, None, "Invalid JSON format in Google credentials"
-            except Exception as e:
-                return None, None, f"Error accessing Google Drive: {str(e)}"
+        # Get the first non-empty line
+        first_line = None
+        lines = text.split('\n')
+        for line in lines:
+            if line.strip():
+                first_line = line.strip()
+                break
 
-        else:
-            # For non-Google Drive URLs
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'application/pdf,application/msword,application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            }
-            try:
-                response = requests.get(cv_url, headers=headers, verify=False)
-                if response.status_code != 200:
-                    return None, None, f"Failed to download file: Status {response.status_code}"
-                content = response.content
-            except Exception as e:
-                return None, None, f"Download error: {str(e)}"
+        if not first_line:
+            return None, None, "No readable content found"
 
-        # Process the file based on type
-        text = ""
-        try:
-            # Check if it's a PDF
-            if content.startswith(b'%PDF'):
-                pdf_reader = PdfReader(io.BytesIO(content))
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        # Clean up text: remove extra whitespace and normalize line breaks
-                        page_text = re.sub(r'\s+', ' ', page_text)
-                        page_text = page_text.replace('\n\n', '\n').strip()
-                        text += page_text + "\n"
-            # Check if it's a DOCX
-            elif content.startswith(b'PK\x03\x04'):
-                doc = Document(io.BytesIO(content))
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-            else:
-                return None, None, "Unsupported file format"
-
-            # Clean up text
-            text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-            text = text.replace('•', '\n•')  # Preserve bullet points
-            text = re.sub(r'([.!?])\s*', r'\1\n', text)  # Split sentences
-            text = re.sub(r'\n\s*\n', '\n', text)  # Remove empty lines
-            text = text.strip()
-
-            if not text:
-                return None, None, "No text content found in document"
-
-            # Get the first non-empty line
-            first_line = None
-            lines = text.split('\n')
-            for line in lines:
-                if line.strip():
-                    first_line = line.strip()
-                    break
-
-            if not first_line:
-                return None, None, "No readable content found"
-
-            return None, first_line, text
+        return None, first_line, text
 
-        except Exception as e:
-            return None, None, f"Error processing document: {str(e)}"
+    except Exception as e:
+        return None, None, f"Error processing document: {str(e)}"
+
+def parse_document_for_experience(cv_url):
+    """Parse PDF/DOC CV to extract first professional experience date and text content"""
+    try:
+        if not cv_url or not cv_url.strip():
+            return None, None, "No CV URL provided"
+
+        content, error = fetch_document(cv_url)
+        if content is None:
+            return None, None, error
+        return parse_document_content(content)
 
     except Exception as e:
         return None, None, f"Error processing document: {str(e)}"
 
-def calculate_years_experience(cv_url=None, start_date_str=None):
-    """Calculate years of experience from CV or start date"""
+def years_experience_from_document(document):
+    """Years of professional experience from the dates in a CV's experience section, or None"""
+    # Define exclusion patterns for non-professional positions
+    exclusion_patterns = [
+        r'freelance', r'freelancing', r'education',
+        r'university', r'college', r'school',
+        r'certificate', r'certification', r'training',
+        r'intern', r'internship', r'student',
+        r'hons\.?', r'b\.?sc\.?', r'bachelor',
+        r'm\.?sc\.?', r'master', r'ph\.?d\.?'
+    ]
+    exclusion_pattern = '|'.join(exclusion_patterns)
+
+    # Define experience section keywords
+    exp_keywords = [
+        'experience', 'work history', 'employment',
+        'professional background', 'career',
+        'work experience', 'professional experience'
+    ]
+
+    # Look for experience sections and dates (document lines are already lowercased)
+    earliest_date = None
+    current_section = ""
+    in_education_section = False
+
+    for line in document.lines:
+        line = line.strip()
+
+        # Skip empty lines
+        if not line:
+            continue
+
+        # Check if we're entering an education section
+        if re.search(r'education|qualifications|academic|degree|university|college', line):
+            in_education_section = True
+            continue
+
+        # Check if we're in an experience section
+        if any(keyword in line for keyword in exp_keywords):
+            current_section = "experience"
+            in_education_section = False
+            continue
+
+        # Skip if not in experience section or if in education section
+        if current_section != "experience" or in_education_section:
+            continue
+
+        # Skip non-professional positions
+        if re.search(exclusion_pattern, line):
+            continue
+
+        # Extract dates using various patterns
+        date_patterns = [
+            r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)[,\s]+\d{4}',
+            r'\d{1,2}/\d{4}',
+            r'\d{1,2}-\d{4}',
+            r'(?:19|20)\d{2}'  # Year pattern limited to reasonable range
+        ]
+
+        for pattern in date_patterns:
+            matches = re.finditer(pattern, line)
+            for match in matches:
+                date_str = match.group(0)
+                parsed_date = dateparser.parse(date_str)
+                if parsed_date:
+                    # Additional check to ensure we're not in an academic context
+                    if not any(academic_term in line for academic_term in [
+                        'graduated', 'degree', 'diploma', 'thesis', 'dissertation',
+                        'academic', 'studied', 'completed', 'coursework'
+                    ]):
+                        if not earliest_date or parsed_date < earliest_date:
+                            earliest_date = parsed_date
+
+    if earliest_date:
+        # Calculate years from earliest date to 2025
+        target_date = datetime(2025, 3, 12)  # Current date (2025)
+        years_exp = (target_date - earliest_date).days / 365.25
+        return round(years_exp, 1)
+    return None
+
+def calculate_years_experience(cv_url=None, start_date_str=None, parsed=None, document=None):
+    """Calculate years of experience from CV or start date
+
+    parsed is the parse_document_for_experience result of cv_url when it was already fetched,
+    and document the CVDocument of its text when the caller has one to share.
+    """
     try:
         # Try to get experience from CV content first
         if cv_url and cv_url.strip():
             try:
                 # Parse CV content
-                _, first_line, cv_content = parse_document_for_experience(cv_url)
+                _, first_line, cv_content = parsed if parsed is not None else parse_document_for_experience(cv_url)
 
                 if not cv_content:
                     return 0, None, "No CV content available"
 
-                # Define exclusion patterns for non-professional positions
-                exclusion_patterns = [
-                    r'freelance', r'freelancing', r'education',
-                    r'university', r'college', r'school',
-                    r'certificate', r'certification', r'training',
-                    r'intern', r'internship', r'student',
-                    r'hons\.?', r'b\.?sc\.?', r'bachelor',
-                    r'm\.?sc\.?', r'master', r'ph\.?d\.?'
-                ]
-                exclusion_pattern = '|'.join(exclusion_patterns)
-
-                # Define experience section keywords
-                exp_keywords = [
-                    'experience', 'work history', 'employment',
-                    'professional background', 'career',
-                    'work experience', 'professional experience'
-                ]
-
-                # Look for experience sections and dates
-                cv_text = cv_content.lower()
-                earliest_date = None
-                current_section = ""
-                in_education_section = False
-
-                for line in cv_text.split('\n'):
-                    line = line.strip()
-
-                    # Skip empty lines
-                    if not line:
-                        continue
-
-                    # Check if we're entering an education section
-                    if re.search(r'education|qualifications|academic|degree|university|college', line.lower()):
-                        in_education_section = True
-                        continue
-
-                    # Check if we're in an experience section
-                    if any(keyword in line for keyword in exp_keywords):
-                        current_section = "experience"
-                        in_education_section = False
-                        continue
-
-                    # Skip if not in experience section or if in education section
-                    if current_section != "experience" or in_education_section:
-                        continue
-
-                    # Skip non-professional positions
-                    if re.search(exclusion_pattern, line.lower()):
-                        continue
-
-                    # Extract dates using various patterns
-                    date_patterns = [
-                        r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)[,\s]+\d{4}',
-                        r'\d{1,2}/\d{4}',
-                        r'\d{1,2}-\d{4}',
-                        r'(?:19|20)\d{2}'  # Year pattern limited to reasonable range
-                    ]
-
-                    for pattern in date_patterns:
-                        matches = re.finditer(pattern, line)
-                        for match in matches:
-                            date_str = match.group(0)
-                            parsed_date = dateparser.parse(date_str)
-                            if parsed_date:
-                                # Additional check to ensure we're not in an academic context
-                                if not any(academic_term in line.lower() for academic_term in [
-                                    'graduated', 'degree', 'diploma', 'thesis', 'dissertation',
-                                    'academic', 'studied', 'completed', 'coursework'
-                                ]):
-                                    if not earliest_date or parsed_date < earliest_date:
-                                        earliest_date = parsed_date
-
-                if earliest_date:
-                    # Calculate years from earliest date to 2025
-                    target_date = datetime(2025, 3, 12)  # Current date (2025)
-                    years_exp = (target_date - earliest_date).days / 365.25
-                    return round(years_exp, 1), first_line, cv_content
+                # Work out years of experience from the dated lines of the experience section
+                if document is None or document.text is not cv_content:
+                    document = CVDocument(cv_content)
+                years_exp = years_experience_from_document(document)
+                if years_exp is not None:
+                    return years_exp, first_line, cv_content
 
             except Exception as e:
                 return 0, None, f"Error processing CV: {str(e)}"